@@ -0,0 +1,57 @@
+"""Keyset pagination over any descending tuple of keys.
+
+Like ``posts.paginator.CursorPaginator``, but a cursor holds the values of
+all keys, so lists ordered by id alone page the same way as feeds ordered
+by (date, id).
+"""
+import base64
+import binascii
+import datetime as dt
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if isinstance(value, dt.datetime)
+              else value for value in values]
+    return base64.urlsafe_b64encode(
+        json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Key values from ``token``, or None for a missing or broken one.
+
+    All keys but the last are dates, the last one is an id.
+    """
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    *dates, pk = values
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        return None
+    if not all(isinstance(date, str) for date in dates):
+        return None
+    try:
+        dates = [parse_datetime(date) for date in dates]
+    except ValueError:
+        return None
+    if None in dates:
+        return None
+    return [*dates, pk]
+
+
+def older_than(keys, values):
+    """Rows after ``values`` in descending ``keys`` order."""
+    condition = Q()
+    for index, key in enumerate(keys):
+        condition |= Q(**dict(zip(keys[:index], values[:index])),
+                       **{f'{key}__lt': values[index]})
+    return condition
@@ -0,0 +1,78 @@
+"""Hand-rolled serializers of the JSON API.
+
+Rows are read with ``values_list`` and written out as JSON one by one, so
+a page builds no model instances and reads only the columns of the
+requested fields. Every serializer maps a public field name to the lookup
+path of its column and, where the raw value is not JSON, a converter.
+"""
+import json
+
+from django.core.files.storage import default_storage
+
+ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def isoformat(value):
+    return value.isoformat()
+
+
+def media_url(name):
+    return default_storage.url(name) if name else None
+
+
+class Serializer:
+    def __init__(self, fields):
+        self.fields = {
+            name: spec if isinstance(spec, tuple) else (spec, None)
+            for name, spec in fields.items()
+        }
+
+    def select(self, names=None):
+        """Requested field names in declaration order, all by default."""
+        if not names:
+            return list(self.fields)
+        unknown = set(names) - self.fields.keys()
+        if unknown:
+            raise ValueError(
+                f'Неизвестные поля: {", ".join(sorted(unknown))}')
+        return [name for name in self.fields if name in names]
+
+    def columns(self, names):
+        return [self.fields[name][0] for name in names]
+
+    def encode(self, names, row):
+        values = list(row[:len(names)])
+        for index, name in enumerate(names):
+            convert = self.fields[name][1]
+            if convert is not None and values[index] is not None:
+                values[index] = convert(values[index])
+        return ENCODER.encode(dict(zip(names, values)))
+
+
+POST = Serializer({
+    'id': 'id',
+    'text': 'text',
+    'pub_date': ('pub_date', isoformat),
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': ('image', media_url),
+    'image_width': 'image_width',
+    'image_height': 'image_height',
+    'comments_count': 'comments_count',
+})
+COMMENT = Serializer({
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': ('created', isoformat),
+})
+GROUP = Serializer({
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+})
+FOLLOW = Serializer({
+    'user': 'user__username',
+    'author': 'author__username',
+})
@@ -0,0 +1,4 @@
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 500
+# Larger pages are streamed row by row instead of built in memory.
+API_STREAM_THRESHOLD = 100
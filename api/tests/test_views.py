@@ -0,0 +1,124 @@
+import base64
+import datetime as dt
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from api.settings import API_STREAM_THRESHOLD
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        start = timezone.now() - dt.timedelta(days=1)
+        cls.posts = []
+        for number in range(5):
+            post = Post.objects.create(
+                text=f'Запись {number}', author=cls.author,
+                group=cls.group if number % 2 else None)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=start + dt.timedelta(hours=number))
+            cls.posts.append(post)
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        if response.streaming:
+            return json.loads(b''.join(response.streaming_content))
+        return response.json()
+
+    def walk(self, url, **params):
+        pages = [self.get(url, **params)]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+        return pages
+
+    def test_posts_are_paged_newest_first(self):
+        pages = self.walk(reverse('api:posts'), limit=2)
+        self.assertEqual([len(page['results']) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            [post['text'] for page in pages for post in page['results']],
+            [f'Запись {number}' for number in reversed(range(5))])
+        self.assertIn('limit=2', pages[0]['next'])
+
+    def test_sparse_fields(self):
+        results = self.get(
+            reverse('api:posts'), fields='id,author')['results']
+        self.assertEqual(results[0], {
+            'id': self.posts[-1].id, 'author': 'author'})
+        response = self.client.get(reverse('api:posts'), {'fields': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_large_pages_are_streamed(self):
+        response = self.client.get(
+            reverse('api:posts'), {'limit': API_STREAM_THRESHOLD + 1})
+        self.assertTrue(response.streaming)
+        self.assertEqual(self.get(
+            reverse('api:posts'), limit=API_STREAM_THRESHOLD + 1
+        )['next'], None)
+
+    def test_post_and_comments(self):
+        post = self.posts[0]
+        self.assertEqual(self.get(
+            reverse('api:post', args=(post.id,)), fields='text,group'
+        ), {'text': 'Запись 0', 'group': None})
+        comments = self.get(reverse('api:post_comments', args=(post.id,)))
+        self.assertEqual(comments['results'][0]['author'], 'reader')
+        response = self.client.get(reverse('api:post', args=(999,)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_group_and_user_posts(self):
+        group_posts = self.get(
+            reverse('api:group_posts', args=('group',)))['results']
+        self.assertEqual([post['id'] for post in group_posts],
+                         [self.posts[3].id, self.posts[1].id])
+        self.assertEqual(self.get(reverse('api:groups'))['results'], [{
+            'slug': 'group', 'title': 'Группа', 'description': 'Описание'}])
+        user_posts = self.get(reverse('api:user_posts', args=('author',)))
+        self.assertEqual(len(user_posts['results']), 5)
+        response = self.client.get(reverse('api:user_posts', args=('x',)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_follows_and_feed(self):
+        follow = {'user': 'reader', 'author': 'author'}
+        self.assertEqual(self.get(reverse(
+            'api:following', args=('reader',)))['results'], [follow])
+        self.assertEqual(self.get(reverse(
+            'api:followers', args=('author',)))['results'], [follow])
+        self.assertEqual(
+            self.client.get(reverse('api:feed')).status_code, 401)
+        self.client.force_login(self.reader)
+        pages = self.walk(reverse('api:feed'), limit=3, fields='id')
+        self.assertEqual(
+            [post['id'] for page in pages for post in page['results']],
+            [post.id for post in reversed(self.posts)])
+
+    def test_broken_cursors_start_from_the_first_page(self):
+        first = self.get(reverse('api:posts'))['results']
+        groups = self.get(reverse('api:groups'))['results']
+        for url, cursor, results in (
+            (reverse('api:posts'), ['x', 1], first),
+            (reverse('api:posts'), [1, 1], first),
+            (reverse('api:posts'), [{'a': 1}, 2], first),
+            (reverse('api:posts'), [timezone.now().isoformat(), '1'], first),
+            (reverse('api:groups'), ['x'], groups),
+            (reverse('api:groups'), [None], groups),
+        ):
+            token = base64.urlsafe_b64encode(
+                json.dumps(cursor).encode()).decode()
+            with self.subTest(url=url, cursor=cursor):
+                self.assertEqual(
+                    self.get(url, after=token)['results'], results)
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api:posts'))
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,35 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/',
+         views.posts,
+         name='posts'),
+    path('posts/<int:post_id>/',
+         views.post_detail,
+         name='post'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
+    path('groups/',
+         views.groups,
+         name='groups'),
+    path('groups/<slug:slug>/posts/',
+         views.group_posts,
+         name='group_posts'),
+    path('users/<str:username>/posts/',
+         views.user_posts,
+         name='user_posts'),
+    path('users/<str:username>/following/',
+         views.following,
+         name='following'),
+    path('users/<str:username>/followers/',
+         views.followers,
+         name='followers'),
+    path('feed/',
+         views.feed,
+         name='feed'),
+]
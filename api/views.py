@@ -0,0 +1,153 @@
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from api.settings import (API_MAX_PAGE_SIZE, API_PAGE_SIZE,
+                          API_STREAM_THRESHOLD)
+from posts import timeline
+from posts.models import Comment, Follow, Group, Post, User
+from . import serializers
+from .pagination import decode_cursor, encode_cursor, older_than
+
+CONTENT_TYPE = 'application/json; charset=utf-8'
+POST_KEYS = ('pub_date', 'id')
+
+
+def error(message, status):
+    return JsonResponse(
+        {'error': message}, status=status,
+        json_dumps_params={'ensure_ascii': False})
+
+
+def requested_fields(request, serializer):
+    fields = request.GET.get('fields')
+    return serializer.select(fields.split(',') if fields else None)
+
+
+def requested_limit(request):
+    try:
+        limit = int(request.GET.get('limit', API_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit должен быть числом')
+    if not 0 < limit <= API_MAX_PAGE_SIZE:
+        raise ValueError(f'limit должен быть от 1 до {API_MAX_PAGE_SIZE}')
+    return limit
+
+
+def page(request, queryset, serializer, keys=POST_KEYS):
+    """One page of ``queryset`` newest first, with a cursor to the next.
+
+    The key columns are read after the requested ones, so the next
+    cursor comes from the same rows. Pages above ``API_STREAM_THRESHOLD``
+    rows are streamed as they are read.
+    """
+    try:
+        names = requested_fields(request, serializer)
+        limit = requested_limit(request)
+    except ValueError as problem:
+        return error(str(problem), 400)
+    after = decode_cursor(request.GET.get('after'), len(keys))
+    if after is not None:
+        queryset = queryset.filter(older_than(keys, after))
+    rows = queryset.order_by(*[f'-{key}' for key in keys]).values_list(
+        *serializer.columns(names), *keys)[:limit + 1]
+
+    def body():
+        yield '{"results":['
+        last = None
+        for count, row in enumerate(rows.iterator()):
+            if count == limit:
+                query = request.GET.copy()
+                query['after'] = encode_cursor(last[len(names):])
+                url = f'{request.path}?{query.urlencode(safe=",")}'
+                yield f'],"next":{serializers.ENCODER.encode(url)}}}'
+                return
+            yield (',' if count else '') + serializer.encode(names, row)
+            last = row
+        yield '],"next":null}'
+
+    if limit > API_STREAM_THRESHOLD:
+        return StreamingHttpResponse(body(), content_type=CONTENT_TYPE)
+    return HttpResponse(''.join(body()), content_type=CONTENT_TYPE)
+
+
+def user_id(username):
+    return User.objects.filter(username=username).values_list(
+        'id', flat=True).first()
+
+
+@require_safe
+def posts(request):
+    return page(request, Post.objects.all(), serializers.POST)
+
+
+@require_safe
+def post_detail(request, post_id):
+    serializer = serializers.POST
+    try:
+        names = requested_fields(request, serializer)
+    except ValueError as problem:
+        return error(str(problem), 400)
+    row = Post.objects.filter(id=post_id).values_list(
+        *serializer.columns(names)).first()
+    if row is None:
+        return error('Запись не найдена', 404)
+    return HttpResponse(
+        serializer.encode(names, row), content_type=CONTENT_TYPE)
+
+
+@require_safe
+def post_comments(request, post_id):
+    if not Post.objects.filter(id=post_id).exists():
+        return error('Запись не найдена', 404)
+    return page(request, Comment.objects.filter(post_id=post_id),
+                serializers.COMMENT, ('created', 'id'))
+
+
+@require_safe
+def groups(request):
+    return page(request, Group.objects.all(), serializers.GROUP, ('id',))
+
+
+@require_safe
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True).first()
+    if group_id is None:
+        return error('Сообщество не найдено', 404)
+    return page(request, Post.objects.filter(group_id=group_id),
+                serializers.POST)
+
+
+@require_safe
+def user_posts(request, username):
+    author_id = user_id(username)
+    if author_id is None:
+        return error('Пользователь не найден', 404)
+    return page(request, Post.objects.filter(author_id=author_id),
+                serializers.POST)
+
+
+@require_safe
+def following(request, username):
+    follower_id = user_id(username)
+    if follower_id is None:
+        return error('Пользователь не найден', 404)
+    return page(request, Follow.objects.filter(user_id=follower_id),
+                serializers.FOLLOW, ('id',))
+
+
+@require_safe
+def followers(request, username):
+    author_id = user_id(username)
+    if author_id is None:
+        return error('Пользователь не найден', 404)
+    return page(request, Follow.objects.filter(author_id=author_id),
+                serializers.FOLLOW, ('id',))
+
+
+@require_safe
+def feed(request):
+    if not request.user.is_authenticated:
+        return error('Требуется авторизация', 401)
+    return page(request, timeline.feed(request.user), serializers.POST,
+                timeline.FEED_KEYS)
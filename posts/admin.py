@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import search
 from .models import Post, Group, Comment, Follow
 
 
@@ -9,6 +10,15 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date",)
     empty_value_display = "-пусто-"
 
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text index replaces the LIKE scan search_fields builds.
+        if not search_term.strip():
+            return queryset, False
+        if not search.match_expression(search_term):
+            return queryset.none(), False
+        return queryset.filter(
+            id__in=search.matching_post_ids(search_term)), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug', 'description',)
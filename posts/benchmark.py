@@ -0,0 +1,346 @@
+"""Latency benchmark of the posts routes.
+
+Every route is requested ``requests`` times by ``concurrency`` threads,
+either in-process through the Django test client or over HTTP against a
+threaded WSGI server started for the run. Queries are counted with
+``connection.execute_wrapper`` in the thread that serves the request, so
+both modes report p50/p95/p99 latency, throughput, and SQL queries and
+SQL time per request.
+
+Results are plain dicts that ``save`` writes as JSON and ``compare``
+checks against an earlier run. Benchmarks written as pytest tests are
+marked ``@pytest.mark.benchmark`` (registered in pytest.ini), so a
+regular run can skip them with ``-m "not benchmark"``.
+"""
+import itertools
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler)
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import AuthorStats, Follow, Group, Post
+
+# ``prepare`` runs before every request to put back the state the previous
+# request changed; it is left out of latencies but not of throughput.
+Route = namedtuple('Route', 'name method path data user prepare',
+                   defaults=(None,))
+Sample = namedtuple('Sample', 'latency status queries sql_time')
+
+RECORD_HEADER = 'X-Benchmark-Request'
+CSRF_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook counting queries and the time they take."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.perf_counter() - started
+
+
+def routes(names=None, authenticated=False):
+    """Requests for every route of ``posts.urls`` that has data to show.
+
+    The busiest author, group and post are used, and the user following
+    the most authors reads the feeds and writes. Pages are requested
+    anonymously unless ``authenticated`` is set; routes that need a
+    login always log in.
+    """
+    author = AuthorStats.objects.select_related('author').order_by(
+        '-posts_count').first()
+    reader = AuthorStats.objects.select_related('author').order_by(
+        '-following_count').first()
+    if author is None or reader is None:
+        return []
+    author, reader = author.author, reader.author
+    viewer = reader if authenticated else None
+    follows = Follow.objects.filter(user=reader, author=author)
+    group = Group.objects.annotate(size=Count('posts')).order_by(
+        '-size').first()
+    post = Post.objects.filter(author=author).order_by(
+        '-comments_count').first()
+    found = [
+        Route('index', 'GET', reverse('posts:index'), None, viewer),
+        Route('search', 'GET',
+              reverse('posts:search') + '?' + urlencode({'q': 'кот'}),
+              None, viewer),
+        Route('profile', 'GET', reverse('posts:profile', args=(
+            author.username,)), None, viewer),
+        Route('trending', 'GET', reverse('posts:trending'), None, viewer),
+        Route('groups', 'GET', reverse('posts:groups'), None, viewer),
+        Route('follow_index', 'GET', reverse('posts:follow_index'),
+              None, reader),
+        Route('new_post', 'POST', reverse('posts:new_post'),
+              {'text': 'Запись для замера'}, reader),
+        Route('profile_follow', 'GET', reverse(
+            'posts:profile_follow', args=(author.username,)), None, reader,
+            follows.delete),
+        Route('profile_unfollow', 'GET', reverse(
+            'posts:profile_unfollow', args=(author.username,)), None, reader,
+            lambda: Follow.objects.get_or_create(user=reader, author=author)),
+    ]
+    if group is not None:
+        found += [
+            Route('group_posts', 'GET', reverse(
+                'posts:group_posts', args=(group.slug,)), None, viewer),
+            Route('group_trending', 'GET', reverse(
+                'posts:group_trending', args=(group.slug,)), None, viewer),
+        ]
+    if post is not None:
+        args = (author.username, post.id)
+        found += [
+            Route('post', 'GET', reverse('posts:post', args=args),
+                  None, viewer),
+            Route('post_comments', 'GET', reverse(
+                'posts:post_comments', args=args), None, viewer),
+            Route('post_edit', 'GET', reverse('posts:post_edit', args=args),
+                  None, author),
+            Route('add_comment', 'POST', reverse(
+                'posts:add_comment', args=args),
+                {'text': 'Комментарий для замера'}, reader),
+        ]
+    return [route for route in found if names is None or route.name in names]
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of sorted ``values``."""
+    return values[max(math.ceil(share * len(values)) - 1, 0)]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample.latency for sample in samples)
+    count = len(samples)
+    return {
+        'requests': count,
+        'errors': sum(sample.status >= 400 for sample in samples),
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': sum(latencies) / count * 1000,
+        'throughput_rps': count / elapsed,
+        'queries': sum(sample.queries for sample in samples) / count,
+        'sql_ms': sum(sample.sql_time for sample in samples) / count * 1000,
+    }
+
+
+class RecordingApplication:
+    """WSGI application that records the queries of every request."""
+
+    def __init__(self, application):
+        self.application = application
+        self.records = {}
+
+    def __call__(self, environ, start_response):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.application(environ, start_response)
+        self.records[environ.get(
+            'HTTP_' + RECORD_HEADER.upper().replace('-', '_'))] = recorder
+        return response
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class NoRedirects(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Runner:
+    def __init__(self, requests=100, concurrency=1, warmup=5, server=False):
+        self.requests = requests
+        self.concurrency = concurrency
+        self.warmup = warmup
+        self.server = server
+        self.local = threading.local()
+
+    def client(self, user):
+        clients = self.local.__dict__.setdefault('clients', {})
+        if user not in clients:
+            client = Client()
+            if user is not None:
+                client.force_login(user)
+            clients[user] = client
+        return clients[user]
+
+    def send_client(self, route):
+        if route.prepare is not None:
+            route.prepare()
+        client = self.client(route.user)
+        request = client.post if route.method == 'POST' else client.get
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            started = time.perf_counter()
+            try:
+                status = request(route.path, route.data).status_code
+            except Exception:
+                # The test client re-raises what the view raised, where a
+                # server would answer with an error page.
+                status = 500
+            latency = time.perf_counter() - started
+        return Sample(latency, status, recorder.count, recorder.time)
+
+    def cookies(self, user):
+        """Session and CSRF cookies of ``user`` for real HTTP requests."""
+        cookies = self.local.__dict__.setdefault('cookies', {})
+        if user not in cookies:
+            token = get_random_string(64, CSRF_CHARS)
+            cookie = f'{settings.CSRF_COOKIE_NAME}={token}'
+            if user is not None:
+                session = self.client(user).cookies[
+                    settings.SESSION_COOKIE_NAME].value
+                cookie += f'; {settings.SESSION_COOKIE_NAME}={session}'
+            cookies[user] = cookie, token
+        return cookies[user]
+
+    def send_http(self, route):
+        if route.prepare is not None:
+            route.prepare()
+        request_id = str(next(self.request_ids))
+        cookie, token = self.cookies(route.user)
+        data = None
+        if route.method == 'POST':
+            data = urlencode(route.data).encode()
+        request = urllib.request.Request(
+            self.base_url + route.path, data=data, method=route.method,
+            headers={'Cookie': cookie, 'X-CSRFToken': token,
+                     RECORD_HEADER: request_id})
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            # Redirects are not followed, so they land here too.
+            error.read()
+            status = error.code
+        latency = time.perf_counter() - started
+        recorder = self.application.records.pop(request_id)
+        return Sample(latency, status, recorder.count, recorder.time)
+
+    @contextmanager
+    def local_server(self):
+        self.application = RecordingApplication(get_wsgi_application())
+        httpd = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+        httpd.set_app(self.application)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        self.base_url = f'http://127.0.0.1:{httpd.server_port}'
+        self.opener = urllib.request.build_opener(NoRedirects)
+        self.request_ids = itertools.count()
+        try:
+            yield
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+    def parallel(self, count, task):
+        """Call ``task`` ``count`` times from ``concurrency`` threads."""
+        if self.concurrency == 1:
+            return [task() for _ in range(count)]
+        started = itertools.count()
+        results, failures = [], []
+
+        def worker():
+            try:
+                while next(started) < count:
+                    results.append(task())
+            except Exception as error:
+                failures.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker)
+                   for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failures:
+            raise failures[0]
+        return results
+
+    def measure(self, route, send):
+        for _ in range(self.warmup):
+            send(route)
+        started = time.perf_counter()
+        samples = self.parallel(self.requests, lambda: send(route))
+        return summarize(samples, time.perf_counter() - started)
+
+    def run(self, routes):
+        report = {
+            'created': timezone.now().isoformat(),
+            'mode': 'server' if self.server else 'client',
+            'requests': self.requests,
+            'concurrency': self.concurrency,
+            'routes': {},
+        }
+        if self.server:
+            with self.local_server():
+                for route in routes:
+                    report['routes'][route.name] = self.measure(
+                        route, self.send_http)
+        else:
+            for route in routes:
+                report['routes'][route.name] = self.measure(
+                    route, self.send_client)
+        return report
+
+
+def save(report, path):
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump(report, stream, ensure_ascii=False, indent=2)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def compare(report, baseline, threshold=0.2):
+    """Routes whose p95 grew by more than ``threshold`` or that issue
+    more queries than in ``baseline``, with what got worse."""
+    regressions = {}
+    for name, current in report['routes'].items():
+        previous = baseline['routes'].get(name)
+        if previous is None:
+            continue
+        problems = []
+        if current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            problems.append(
+                f'p95 {previous["p95_ms"]:.1f} → {current["p95_ms"]:.1f} мс')
+        # Averages wobble when some requests fail, whole queries do not.
+        if round(current['queries']) > round(previous['queries']):
+            problems.append(
+                f'запросов {previous["queries"]:.1f} → '
+                f'{current["queries"]:.1f}')
+        if problems:
+            regressions[name] = problems
+    return regressions
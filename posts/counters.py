@@ -0,0 +1,96 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import group_stats
+from .models import AuthorStats, Comment, Follow, Group, GroupStats, Post, User
+
+COUNTERS = (
+    (Post, 'comments_count', Comment, 'post'),
+    (AuthorStats, 'posts_count', Post, 'author'),
+    (AuthorStats, 'followers_count', Follow, 'author'),
+    (AuthorStats, 'following_count', Follow, 'user'),
+    (GroupStats, 'posts_count', Post, 'group'),
+)
+AUTHOR_COUNTERS = [counter for counter in COUNTERS
+                   if counter[0] is AuthorStats]
+
+
+def actual(source, key):
+    """Correlated COUNT of ``source`` rows pointing at the outer row."""
+    rows = (source.objects.filter(**{key: OuterRef('pk')})
+            .order_by().values(key).annotate(total=Count('pk'))
+            .values('total'))
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def change_post(post_id, **deltas):
+    Post.objects.filter(pk=post_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def change_author(author_id, **deltas):
+    updated = AuthorStats.objects.filter(pk=author_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()})
+    if not updated and min(deltas.values()) > 0:
+        AuthorStats.objects.get_or_create(author_id=author_id)
+        AuthorStats.objects.filter(pk=author_id).update(**{
+            field: actual(source, key)
+            for _, field, source, key in AUTHOR_COUNTERS
+        })
+
+
+def follow_changed(follow, delta):
+    with transaction.atomic():
+        change_author(follow.author_id, followers_count=delta)
+        change_author(follow.user_id, following_count=delta)
+
+
+def missing_stats():
+    return User.objects.filter(stats__isnull=True)
+
+
+def missing_group_stats():
+    return Group.objects.filter(stats__isnull=True)
+
+
+def stale(model, field, source, key):
+    return (model.objects.annotate(actual=actual(source, key))
+            .exclude(**{field: F('actual')}))
+
+
+def recount(fix=True, batch_size=1000):
+    """Verify every counter and rewrite the stale ones in bulk.
+
+    Returns a mapping of counter label to the number of wrong rows.
+    """
+    report = {'stats': missing_stats().count()}
+    if fix and report['stats']:
+        # Django 2.2 does not cap an explicit batch_size at what the
+        # database accepts in one statement.
+        batch_size = min(batch_size, connection.ops.bulk_batch_size(
+            AuthorStats._meta.concrete_fields, []))
+        AuthorStats.objects.bulk_create(
+            (AuthorStats(author_id=pk)
+             for pk in missing_stats().values_list('pk', flat=True)),
+            batch_size=batch_size
+        )
+    groups = list(missing_group_stats().values_list('pk', flat=True))
+    report['group_stats'] = len(groups)
+    if fix and groups:
+        GroupStats.objects.bulk_create(
+            GroupStats(group_id=pk) for pk in groups)
+    for model, field, source, key in COUNTERS:
+        wrong = stale(model, field, source, key)
+        label = f'{model._meta.model_name}.{field}'
+        report[label] = wrong.count()
+        if fix and report[label]:
+            if model is GroupStats:
+                groups += wrong.values_list('pk', flat=True)
+            model.objects.filter(pk__in=wrong.values('pk')).update(
+                **{field: actual(source, key)})
+    if fix:
+        # Last activity and recent authors go stale along with the count.
+        for group_id in set(groups):
+            group_stats.refresh(group_id)
+    return report
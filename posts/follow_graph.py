@@ -0,0 +1,101 @@
+"""Who follows whom, kept in the cache as one sorted array per user.
+
+A user's following set is stored as the bytes of an ``array`` of author
+ids in ascending order: four bytes per follow, loaded without building an
+object per id and searched by bisection. The array is cached under the
+generation of the user's following scope, which follow signals bump, so
+a write never edits a cached set: the next read loads it again. A load
+that raced a write stored its set under a generation nobody reads any
+more. Bulk loads that skip signals (import_social, seed_yatube) clear the
+cache afterwards.
+"""
+import bisect
+from array import array
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+
+from posts.settings import FOLLOW_GRAPH_TIMEOUT
+from . import generations
+from .models import Follow
+
+# AutoField ids are 32-bit signed integers, so four bytes hold any of them.
+TYPECODE = 'I'
+
+
+def key(user_id, generation):
+    return f'following:{user_id}:{generation}'
+
+
+def pk(user):
+    return getattr(user, 'pk', user)
+
+
+def decode(data):
+    ids = array(TYPECODE)
+    ids.frombytes(data)
+    return ids
+
+
+def position(ids, author_id):
+    """Index of ``author_id`` in ``ids``, or where it would be inserted,
+    and whether it is there."""
+    index = bisect.bisect_left(ids, author_id)
+    return index, index < len(ids) and ids[index] == author_id
+
+
+def load(user_id, generation):
+    # The set outlives the replica's lag by far, so it is read from the
+    # primary, whose writes the generation follows.
+    follows = Follow.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user_id)
+    ids = array(TYPECODE, follows.order_by('author_id').values_list(
+        'author_id', flat=True))
+    cache.set(key(user_id, generation), ids.tobytes(), FOLLOW_GRAPH_TIMEOUT)
+    return ids
+
+
+def following_ids(user):
+    # The generation is read before the follows, so a write committed in
+    # between bumps it past the key the stale set is stored under.
+    generation = generations.get(generations.following_scope(pk(user)))
+    data = cache.get(key(pk(user), generation))
+    if data is None:
+        return load(pk(user), generation)
+    return decode(data)
+
+
+def is_following(user, authors):
+    """Map every one of ``authors`` (users or ids) to whether ``user``
+    follows them, from one cached set."""
+    ids = following_ids(user)
+    return {author_id: position(ids, author_id)[1]
+            for author_id in map(pk, authors)}
+
+
+def follows(user, author):
+    return is_following(user, [author])[pk(author)]
+
+
+def changed(follow):
+    generations.bump(generations.following_scope(follow.user_id))
+
+
+def follow(user, author):
+    """Follow ``author``; False if ``user`` already does.
+
+    One INSERT, and the unique constraint rejects a duplicate, so two
+    concurrent requests cannot both pass an existence check and insert.
+    """
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user_id=pk(user), author_id=pk(author))
+    except IntegrityError:
+        return False
+    return True
+
+
+def unfollow(user, author):
+    """Stop following ``author``; False if ``user`` did not follow."""
+    deleted, _ = Follow.objects.filter(
+        user_id=pk(user), author_id=pk(author)).delete()
+    return bool(deleted)
@@ -1,15 +1,44 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import Textarea
+from PIL import Image
 
+from . import images
 from .models import Comment, Post
 
 
 class PostForm(forms.ModelForm):
+    ingested = None
+
     class Meta:
         model = Post
         fields = ('group', 'text', 'image')
         widgets = {'text': Textarea(attrs={"placeholder": "Введите текст"})}
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            try:
+                self.ingested = images.ingest(image)
+            except (OSError, Image.DecompressionBombError):
+                raise forms.ValidationError(
+                    'Изображение повреждено или слишком велико.')
+            return self.ingested.original
+        return image
+
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        if self.ingested is not None:
+            post.image_width = self.ingested.width
+            post.image_height = self.ingested.height
+            post.image_compact = self.ingested.rendition
+        elif not post.image:
+            post.image_width = post.image_height = None
+            post.image_compact = None
+        if commit:
+            post.save()
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
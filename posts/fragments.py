@@ -0,0 +1,65 @@
+"""Rendered post cards, cached one per post.
+
+A card is stored under a digest of everything it shows, so an edited
+post, a renamed author or group and a new comment all give a new key and
+a stale card is never served; the old one just expires. A feed page looks
+up all of its cards with one ``get_many`` and renders only the missing
+ones.
+
+The edit button depends on who is looking, so cards are cached without
+it and the button is put into ``EDIT_SLOT`` for the author's own posts.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.template.loader import get_template, render_to_string
+
+from posts.settings import POST_CARD_TIMEOUT
+
+# Bump when post_item.html changes, so cards rendered by the old
+# template are not served any more.
+CARD_VERSION = 1
+EDIT_SLOT = '<!-- edit-button -->'
+
+
+def card_key(post, authenticated, hide_group):
+    group = post.group_id and (post.group.slug, post.group.title)
+    digest = hashlib.sha1(repr((
+        CARD_VERSION, post.text, post.image.name or '',
+        post.image_compact.name or '',
+        post.author.username, group, post.comments_count,
+        post.pub_date.isoformat(), authenticated, hide_group,
+    )).encode()).hexdigest()
+    return f'card:{post.id}:{digest}'
+
+
+def edit_button(post, user):
+    if user.is_authenticated and user.id == post.author_id:
+        return render_to_string('post_edit_button.html', {'post': post})
+    return ''
+
+
+def render_cards(posts, user, hide_group=False):
+    posts = list(posts)
+    keys = [card_key(post, user.is_authenticated, hide_group)
+            for post in posts]
+    cards = cache.get_many(keys)
+    rendered = {}
+    template = None
+    for post, key in zip(posts, keys):
+        if key in cards:
+            continue
+        if template is None:
+            template = get_template('post_item.html')
+        cards[key] = template.render({
+            'post': post, 'user': user, 'hide_the_group_name': hide_group})
+        # Until its thumbnail is ready a card shows the full image, and a
+        # finished thumbnail does not change the key.
+        if not getattr(post, 'thumbnail_pending', False):
+            rendered[key] = cards[key]
+    if rendered:
+        cache.set_many(rendered, POST_CARD_TIMEOUT)
+    return ''.join(
+        cards[key].replace(EDIT_SLOT, edit_button(post, user))
+        for post, key in zip(posts, keys)
+    )
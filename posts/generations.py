@@ -0,0 +1,96 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+INDEX = 'index'
+
+
+def key(scope):
+    return f'generation:{scope}'
+
+
+def modified_key(scope):
+    return f'modified:{scope}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def following_scope(user_id):
+    return f'following:{user_id}'
+
+
+def post_scopes(author_id, *group_ids):
+    """Feeds a post with this author and these groups is shown in."""
+    scopes = [INDEX, author_scope(author_id)]
+    scopes += [group_scope(pk) for pk in set(group_ids) if pk is not None]
+    return scopes
+
+
+def initial():
+    # Starting from the clock keeps a generation that was evicted from
+    # the cache from coming back with a value that was already used.
+    return int(time.time() * 1000)
+
+
+def get(scope):
+    generation = cache.get(key(scope))
+    if generation is None:
+        cache.add(key(scope), initial(), None)
+        generation = cache.get(key(scope))
+    return generation
+
+
+def state(scopes):
+    """Generations of ``scopes`` and the time any of them last changed.
+
+    A modification time lost from the cache counts as "now", which can
+    only make clients re-download a page, never keep a stale one.
+    """
+    keys = [key(scope) for scope in scopes]
+    modified_keys = [modified_key(scope) for scope in scopes]
+    values = cache.get_many(keys + modified_keys)
+    generations = [
+        values[name] if name in values else get(scope)
+        for name, scope in zip(keys, scopes)
+    ]
+    now = time.time()
+    for name in modified_keys:
+        if name not in values:
+            cache.add(name, now, None)
+            values[name] = cache.get(name, now)
+    return generations, max(values[name] for name in modified_keys)
+
+
+def bump(*scopes, modified=None):
+    """Move ``scopes`` to new generations now and again once the current
+    transaction commits.
+
+    A concurrent reader can see the first move while it still reads the
+    snapshot from before the write, and cache the old page under the new
+    key. The move on commit leaves that page behind.
+    """
+    apply(scopes, modified)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: apply(scopes, modified))
+
+
+def apply(scopes, modified=None):
+    for scope in scopes:
+        try:
+            cache.incr(key(scope))
+        except ValueError:
+            cache.add(key(scope), initial(), None)
+    modified = time.time() if modified is None else modified.timestamp()
+    cache.set_many(
+        {modified_key(scope): modified for scope in scopes}, None)
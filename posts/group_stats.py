@@ -0,0 +1,69 @@
+"""Per-group rollup behind the groups directory.
+
+``GroupStats`` keeps, for every group, its number of posts, the moment of
+its last post and the names of the authors of its latest posts, so the
+directory reads one row per group instead of counting and scanning posts.
+A new post updates its group's row in place. Deleting a post or moving it
+out of a group may remove the latest one, so the row is then refreshed
+from the group's newest posts through the (group, -pub_date) index,
+reading at most ``GROUP_RECENT_SCAN`` of them. Deleting a group deletes
+its row; its posts are left without a group and need no rollup.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from posts.settings import GROUP_RECENT_AUTHORS, GROUP_RECENT_SCAN
+from .models import GroupStats, Post
+
+
+def latest(group_id):
+    """The newest post date of the group and its latest distinct authors,
+    newest first."""
+    rows = Post.objects.filter(group_id=group_id).order_by(
+        '-pub_date', '-id').values_list(
+            'pub_date', 'author__username')[:GROUP_RECENT_SCAN]
+    last, names = None, []
+    for pub_date, username in rows:
+        last = last or pub_date
+        if username not in names:
+            names.append(username)
+            if len(names) == GROUP_RECENT_AUTHORS:
+                break
+    return last, names
+
+
+def refresh(group_id):
+    last, names = latest(group_id)
+    changes = {'recent_authors': GroupStats.SEPARATOR.join(names)}
+    if last is not None:
+        # An emptied group keeps the moment of its last activity.
+        changes['last_activity'] = last
+    GroupStats.objects.filter(pk=group_id).update(**changes)
+
+
+def post_added(post):
+    with transaction.atomic():
+        stats, _ = GroupStats.objects.select_for_update().get_or_create(
+            group_id=post.group_id)
+        if post.pub_date < stats.last_activity and stats.posts_count:
+            # A post moved in from another group may be older than the
+            # ones already here.
+            GroupStats.objects.filter(pk=post.group_id).update(
+                posts_count=F('posts_count') + 1)
+            refresh(post.group_id)
+            return
+        names = [post.author.username] + [
+            name for name in stats.authors()
+            if name != post.author.username]
+        stats.posts_count = F('posts_count') + 1
+        stats.last_activity = post.pub_date
+        stats.recent_authors = GroupStats.SEPARATOR.join(
+            names[:GROUP_RECENT_AUTHORS])
+        stats.save()
+
+
+def post_removed(group_id):
+    with transaction.atomic():
+        GroupStats.objects.filter(pk=group_id).update(
+            posts_count=F('posts_count') - 1)
+        refresh(group_id)
@@ -0,0 +1,101 @@
+"""Uploaded images are normalised once, while they are being stored.
+
+The upload is decoded a single time: EXIF orientation is applied, pictures
+larger than ``IMAGE_MAX_SIZE`` are scaled down (JPEGs already while they are
+decoded), and a compact rendition is written next to the original. The
+size of the stored image is returned so it can be kept on the post and
+nothing has to open the file again just to learn it.
+"""
+import os
+import tempfile
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.files import File
+from PIL import Image, features
+
+from posts.settings import (IMAGE_MAX_SIZE, IMAGE_QUALITY, RENDITION_QUALITY,
+                            RENDITION_SIZE)
+
+ORIENTATION = 0x0112
+TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+# Multi-picture JPEGs from phone cameras are stored as plain JPEGs.
+SAVE_AS = {'MPO': 'JPEG'}
+# Pillow builds without libwebp fall back to a JPEG rendition.
+RENDITION_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+
+Ingested = namedtuple('Ingested', 'original rendition width height')
+
+
+def encode(image, stem, image_format, quality):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert(
+            'RGBA' if 'transparency' in image.info
+            or image.mode.endswith('A') else 'RGB')
+    params = {'optimize': True}
+    if image_format in ('JPEG', 'WEBP'):
+        params.update(quality=quality, progressive=True)
+    # Spills to disk past the in-memory upload limit, like uploads do.
+    buffer = tempfile.SpooledTemporaryFile(
+        settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    image.save(buffer, image_format, **params)
+    buffer.seek(0)
+    return File(buffer, name=stem + EXTENSIONS[image_format])
+
+
+def ingest(upload):
+    """Return the file to store for ``upload``, its rendition and size.
+
+    An upload that is neither rotated nor oversized is stored byte for
+    byte. Animated images are stored untouched and get no rendition,
+    since re-encoding would keep only their first frame.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    if getattr(image, 'is_animated', False):
+        upload.seek(0)
+        return Ingested(upload, None, *image.size)
+    source_format = SAVE_AS.get(image.format, image.format)
+    orientation = image.getexif().get(ORIENTATION)
+    size = image.size
+    image.draft(image.mode, IMAGE_MAX_SIZE)
+    changed = image.size != size
+    method = TRANSPOSE.get(orientation)
+    if method is not None:
+        image = image.transpose(method)
+        changed = True
+    if image.width > IMAGE_MAX_SIZE[0] or image.height > IMAGE_MAX_SIZE[1]:
+        image.thumbnail(IMAGE_MAX_SIZE, Image.LANCZOS)
+        changed = True
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    if changed:
+        original = encode(
+            image,
+            stem,
+            source_format if source_format in EXTENSIONS else 'PNG',
+            IMAGE_QUALITY,
+        )
+    else:
+        upload.seek(0)
+        original = upload
+    rendition = image.copy()
+    rendition.thumbnail(RENDITION_SIZE, Image.LANCZOS)
+    rendition = encode(
+        rendition, f'{stem}_compact', RENDITION_FORMAT, RENDITION_QUALITY)
+    return Ingested(
+        original,
+        rendition,
+        image.width,
+        image.height,
+    )
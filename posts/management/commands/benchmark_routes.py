@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmark
+
+COLUMNS = (
+    ('p50_ms', 'p50, мс', '.1f'),
+    ('p95_ms', 'p95, мс', '.1f'),
+    ('p99_ms', 'p99, мс', '.1f'),
+    ('throughput_rps', 'запр/с', '.0f'),
+    ('queries', 'SQL', '.1f'),
+    ('sql_ms', 'SQL, мс', '.1f'),
+    ('errors', 'ошибки', 'd'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку, пропускную способность и SQL-запросы '
+            'страниц приложения posts и сравнивает с прошлым замером. '
+            'Запросы на запись создают записи, комментарии и подписки, '
+            'поэтому запускайте на копии базы, например после seed_yatube.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--routes', nargs='+',
+            help='Имена маршрутов posts.urls; по умолчанию все.')
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--server', action='store_true',
+            help='Отправлять запросы по HTTP локальному WSGI-серверу '
+                 'вместо тестового клиента Django.')
+        parser.add_argument(
+            '--authenticated', action='store_true',
+            help='Открывать страницы от имени пользователя, а не гостя.')
+        parser.add_argument('--output', help='Сохранить результаты в JSON.')
+        parser.add_argument(
+            '--baseline', help='JSON прошлого замера для сравнения.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост p95 относительно прошлого замера.')
+
+    def handle(self, *args, **options):
+        routes = benchmark.routes(
+            options['routes'], authenticated=options['authenticated'])
+        if not routes:
+            raise CommandError(
+                'Нет данных для замера: заполните базу, например '
+                'командой seed_yatube.')
+        report = benchmark.Runner(
+            requests=options['requests'],
+            concurrency=options['concurrency'],
+            warmup=options['warmup'],
+            server=options['server'],
+        ).run(routes)
+        self.stdout.write(f'{"":18}' + ''.join(
+            f'{title:>10}' for _, title, _ in COLUMNS))
+        for name, stats in report['routes'].items():
+            self.stdout.write(f'{name:18}' + ''.join(
+                f'{stats[key]:>10{spec}}' for key, _, spec in COLUMNS))
+        if options['output']:
+            benchmark.save(report, options['output'])
+        if options['baseline']:
+            regressions = benchmark.compare(
+                report, benchmark.load(options['baseline']),
+                options['threshold'])
+            for name, problems in regressions.items():
+                self.stdout.write(self.style.ERROR(
+                    f'{name}: {", ".join(problems)}'))
+            if regressions:
+                raise CommandError(
+                    f'Замедлились маршруты: {", ".join(regressions)}')
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
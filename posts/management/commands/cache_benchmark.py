@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from yatube.cache import SQLiteCache
+
+MANY_KEYS = 10
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLiteCache, '
+            'LocMemCache и FileBasedCache.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', type=int, default=2000)
+        parser.add_argument('--value-size', type=int, default=2048)
+
+    def operations(self, cache, count, value):
+        keys = [f'key_{number}' for number in range(count)]
+        cache.set('counter', 0)
+        return [
+            ('set', lambda: [cache.set(key, value) for key in keys]),
+            ('get', lambda: [cache.get(key) for key in keys]),
+            ('get_many', lambda: [
+                cache.get_many(keys[start:start + MANY_KEYS])
+                for start in range(0, count, MANY_KEYS)]),
+            ('set_many', lambda: [
+                cache.set_many({key: value
+                                for key in keys[start:start + MANY_KEYS]})
+                for start in range(0, count, MANY_KEYS)]),
+            ('incr', lambda: [cache.incr('counter') for _ in keys]),
+        ]
+
+    def handle(self, *args, **options):
+        count = options['operations']
+        value = 'x' * options['value_size']
+        params = {'OPTIONS': {'MAX_ENTRIES': count * 2}}
+        directory = tempfile.mkdtemp()
+        backends = [
+            ('locmem', LocMemCache('cache-benchmark', params)),
+            ('filebased', FileBasedCache(
+                os.path.join(directory, 'files'), params)),
+            ('sqlite', SQLiteCache(
+                os.path.join(directory, 'cache.sqlite3'), params)),
+        ]
+        try:
+            self.stdout.write(f'{"":10}' + ''.join(
+                f'{name:>12}' for name, _ in self.operations(
+                    backends[0][1], 0, value)))
+            for name, cache in backends:
+                row = f'{name:10}'
+                for _, run in self.operations(cache, count, value):
+                    started = time.perf_counter()
+                    run()
+                    row += f'{count / (time.perf_counter() - started):12.0f}'
+                self.stdout.write(row)
+            self.stdout.write('операций в секунду')
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from yatube.db import maintain
+
+
+class Command(BaseCommand):
+    help = ('Обслуживает базу SQLite: обновляет статистику (ANALYZE), '
+            'освобождает пустые страницы и переносит WAL в базу. '
+            'Запускается по расписанию.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--pages', type=int,
+            help='Сколько пустых страниц освободить, по умолчанию все.')
+
+    def handle(self, *args, **options):
+        report = maintain(options['database'], options['pages'])
+        for label, value in report.items():
+            self.stdout.write(f'{label}: {value}')
+        self.stdout.write(self.style.SUCCESS('Обслуживание завершено.'))
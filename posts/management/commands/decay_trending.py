@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import expire, rebuild
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из популярного записи, обсуждение которых затихло. '
+            'Запускается по расписанию.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Сначала пересчитать популярность по всем комментариям.')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            scored = rebuild()
+            self.stdout.write(f'Пересчитано записей: {scored}')
+        self.stdout.write(f'Удалено затихших записей: {expire()}')
+        self.stdout.write(self.style.SUCCESS('Популярное обновлено.'))
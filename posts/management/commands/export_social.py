@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import export
+
+
+class Command(BaseCommand):
+    help = ('Выгружает сообщества, записи, комментарии и подписки '
+            'в формате JSONL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл для выгрузки, "-" для стандартного вывода.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        # Progress goes to stderr so the dump can be piped.
+        write = self.stderr.write
+        if options['path'] == '-':
+            export(sys.stdout, write, options['chunk_size'])
+            return
+        with open(options['path'], 'w', encoding='utf-8') as stream:
+            export(stream, write, options['chunk_size'])
+        write(self.style.SUCCESS(f'Выгружено в {options["path"]}.'))
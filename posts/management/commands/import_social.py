@@ -0,0 +1,40 @@
+import sys
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from posts import timeline
+from posts.counters import recount
+from posts.transfer import Importer
+
+
+class Command(BaseCommand):
+    help = ('Загружает сообщества, записи, комментарии и подписки '
+            'из JSONL-выгрузки export_social.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл выгрузки, "-" для стандартного ввода.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--keep-ids', action='store_true',
+            help='Сохранить номера записей (для загрузки в пустую базу).')
+
+    def handle(self, *args, **options):
+        importer = Importer(options['batch_size'], options['keep_ids'])
+        try:
+            if options['path'] == '-':
+                importer.load(sys.stdin, self.stdout.write)
+            else:
+                with open(options['path'], encoding='utf-8') as stream:
+                    importer.load(stream, self.stdout.write)
+        except (IntegrityError, KeyError, ValueError) as error:
+            # json.JSONDecodeError is a ValueError as well.
+            raise CommandError(f'Выгрузка не загружена: {error!r}')
+        # bulk_create sends no signals: counters, timelines and cached
+        # pages are brought up to date for the whole database at once.
+        recount()
+        timeline.rebuild()
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import rebuild
+from posts.settings import SUGGESTIONS_NUMBER
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рекомендации «на кого подписаться» '
+            'по подпискам подписок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=SUGGESTIONS_NUMBER,
+            help='Сколько рекомендаций хранить для каждого пользователя.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild(options['top'], options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Сохранено рекомендаций: {written}.'))
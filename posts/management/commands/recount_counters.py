@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import recount
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики записей, подписок и комментариев '
+            'и исправляет расхождения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить счётчики, ничего не изменяя.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        report = recount(
+            fix=not options['check'], batch_size=options['batch_size'])
+        for label, wrong in report.items():
+            self.stdout.write(f'{label}: {wrong}')
+        if options['check'] and any(report.values()):
+            raise CommandError('Счётчики расходятся с данными.')
+        self.stdout.write(self.style.SUCCESS('Счётчики в порядке.'))
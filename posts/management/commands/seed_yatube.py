@@ -0,0 +1,56 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from posts import search, timeline
+from posts.counters import recount
+from posts.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, сообществами, '
+            'записями, комментариями и подписками для нагрузочных тестов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=300000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок одного пользователя.')
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного распределения активности.')
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до текущего момента распределить записи.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=20000)
+        parser.add_argument(
+            '--no-timelines', action='store_true',
+            help='Не заполнять ленты подписок.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        seeder = Seeder(
+            seed=options['seed'],
+            alpha=options['alpha'],
+            batch_size=options['batch_size'],
+            days=options['days'],
+            write=self.stdout.write,
+        )
+        seeder.create_users(options['users'])
+        seeder.create_groups(options['groups'])
+        with search.indexing_deferred():
+            seeder.create_posts(options['posts'])
+            seeder.create_comments(options['comments'])
+        seeder.create_follows(options['follows'])
+        # Bulk inserts send no signals, as in import_social.
+        recount()
+        if not options['no_timelines']:
+            timeline.rebuild()
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с.'))
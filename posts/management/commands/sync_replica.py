@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from yatube.db import REPLICA, sync_replica
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу данных в реплику для чтения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование каждые N секунд до остановки.')
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError(
+                'Реплика не настроена: задайте REPLICA_DATABASE.')
+        while True:
+            started = time.perf_counter()
+            sync_replica()
+            self.stdout.write(self.style.SUCCESS(
+                f'Реплика обновлена за '
+                f'{time.perf_counter() - started:.2f} с.'))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# External-content FTS5 tables: the text lives in posts_post/posts_comment
+# only, the triggers keep the index in step with every insert, update and
+# delete, including Django's cascades and bulk operations.
+INDEXES = {
+    'posts_post': 'posts_post_fts',
+    'posts_comment': 'posts_comment_fts',
+}
+CREATE = (
+    "CREATE VIRTUAL TABLE {index} USING fts5("
+    " text, content='{table}', content_rowid='id',"
+    " tokenize='unicode61', prefix='2 3')",
+    "CREATE TRIGGER {index}_insert AFTER INSERT ON {table} BEGIN"
+    " INSERT INTO {index}(rowid, text) VALUES (new.id, new.text);"
+    " END",
+    "CREATE TRIGGER {index}_delete AFTER DELETE ON {table} BEGIN"
+    " INSERT INTO {index}({index}, rowid, text)"
+    " VALUES ('delete', old.id, old.text);"
+    " END",
+    "CREATE TRIGGER {index}_update AFTER UPDATE OF text ON {table} BEGIN"
+    " INSERT INTO {index}({index}, rowid, text)"
+    " VALUES ('delete', old.id, old.text);"
+    " INSERT INTO {index}(rowid, text) VALUES (new.id, new.text);"
+    " END",
+    "INSERT INTO {index}({index}) VALUES ('rebuild')",
+)
+DROP = (
+    'DROP TRIGGER {index}_insert',
+    'DROP TRIGGER {index}_delete',
+    'DROP TRIGGER {index}_update',
+    'DROP TABLE {index}',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_image_renditions'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [sql.format(table=table, index=index) for sql in CREATE],
+            [sql.format(index=index) for sql in DROP],
+        )
+        for table, index in INDEXES.items()
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.6 on 2026-10-18 05:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    Post = apps.get_model('posts', 'Post')
+    totals = dict(Post.objects.filter(group__isnull=False).order_by()
+                  .values_list('group_id').annotate(total=models.Count('pk')))
+    rows = []
+    for group_id in Group.objects.values_list('pk', flat=True).iterator():
+        stats = GroupStats(group_id=group_id,
+                           posts_count=totals.get(group_id, 0))
+        names = []
+        latest = Post.objects.filter(group_id=group_id).order_by(
+            '-pub_date', '-id').values_list('pub_date', 'author__username')
+        for pub_date, username in latest[:100]:
+            if not names:
+                stats.last_activity = pub_date
+            if username not in names:
+                names.append(username)
+                if len(names) == 5:
+                    break
+        stats.recent_authors = ','.join(names)
+        rows.append(stats)
+    GroupStats.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='Записей')),
+                ('last_activity', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Последняя активность')),
+                ('recent_authors', models.CharField(blank=True, help_text='Имена последних авторов через запятую', max_length=1000, verbose_name='Недавние авторы')),
+            ],
+            options={
+                'verbose_name': 'Счётчики группы',
+                'verbose_name_plural': 'Счётчики групп',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['-last_activity', '-group'], name='groupstats_last_activity'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
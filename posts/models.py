@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -30,6 +31,20 @@ class Group(models.Model):
         verbose_name_plural = 'Группы'
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Everything post_item.html needs, in the feed query itself.
+
+        The comment count is the denormalized ``comments_count`` column,
+        so no per-post COUNT or aggregate is required.
+        """
+        return self.select_related('author', 'group').only(
+            'text', 'pub_date', 'image', 'image_compact', 'image_width',
+            'image_height', 'comments_count',
+            'author__username', 'group__title', 'group__slug',
+        )
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Запись',
@@ -59,6 +74,39 @@ class Post(models.Model):
         blank=True,
         null=True
     )
+    image_compact = models.ImageField(
+        upload_to='posts/',
+        verbose_name='Сжатое изображение',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина изображения',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота изображения',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    comments_count = models.IntegerField(
+        verbose_name='Комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets save() handlers see which group the post is moved out of.
+        instance.loaded_group_id = instance.__dict__.get('group_id')
+        return instance
 
     def __str__(self):
         return (f'{self.author.username}, '
@@ -68,6 +116,26 @@ class Post(models.Model):
         verbose_name = 'Запись'
         verbose_name_plural = 'Записи'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_id'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date'
+            ),
+        ]
+
+
+class CommentManager(models.Manager):
+    def for_thread(self):
+        return self.get_queryset().select_related('author').only(
+            'post_id', 'text', 'created', 'author__username',
+        )
 
 
 class Comment(models.Model):
@@ -92,9 +160,17 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    objects = CommentManager()
+
     class Meta:
         verbose_name = 'Комментарии'
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -113,8 +189,184 @@ class Follow(models.Model):
 
     class Meta:
         verbose_name = 'Подписки'
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'author'], name='unique_author_user_following'
             )
         ]
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        verbose_name='Автор',
+        related_name='stats',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    posts_count = models.IntegerField(
+        verbose_name='Записей',
+        default=0
+    )
+    followers_count = models.IntegerField(
+        verbose_name='Подписчиков',
+        default=0
+    )
+    following_count = models.IntegerField(
+        verbose_name='Подписок',
+        default=0
+    )
+
+    class Meta:
+        verbose_name = 'Счётчики автора'
+        verbose_name_plural = 'Счётчики авторов'
+
+
+class Timeline(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        related_name='timeline',
+        on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Запись',
+        related_name='timeline',
+        on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+
+    class Meta:
+        verbose_name = 'Лента подписок'
+        ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_user_post'
+            )
+        ]
+
+
+class Suggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        related_name='suggestions',
+        on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    score = models.FloatField(
+        verbose_name='Оценка'
+    )
+    rank = models.PositiveSmallIntegerField(
+        verbose_name='Место'
+    )
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        ordering = ('user', 'rank')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'rank'], name='unique_suggestion_user_rank'
+            )
+        ]
+
+
+class PostScore(models.Model):
+    post = models.OneToOneField(
+        Post,
+        verbose_name='Запись',
+        related_name='score',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    group = models.ForeignKey(
+        Group,
+        verbose_name='Группа',
+        related_name='+',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True
+    )
+    hotness = models.FloatField(
+        verbose_name='Популярность',
+        help_text='Двоичный логарифм веса комментариев к записи'
+    )
+
+    class Meta:
+        verbose_name = 'Популярность записи'
+        verbose_name_plural = 'Популярность записей'
+        indexes = [
+            models.Index(
+                fields=['-hotness'], name='postscore_hotness'
+            ),
+            models.Index(
+                fields=['group', '-hotness'], name='postscore_group_hotness'
+            ),
+        ]
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        verbose_name='Группа',
+        related_name='stats',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    posts_count = models.IntegerField(
+        verbose_name='Записей',
+        default=0
+    )
+    last_activity = models.DateTimeField(
+        verbose_name='Последняя активность',
+        default=timezone.now
+    )
+    recent_authors = models.CharField(
+        verbose_name='Недавние авторы',
+        help_text='Имена последних авторов через запятую',
+        max_length=1000,
+        blank=True
+    )
+
+    SEPARATOR = ','
+
+    def authors(self):
+        if not self.recent_authors:
+            return []
+        return self.recent_authors.split(self.SEPARATOR)
+
+    class Meta:
+        verbose_name = 'Счётчики группы'
+        verbose_name_plural = 'Счётчики групп'
+        indexes = [
+            models.Index(
+                fields=['-last_activity', '-group'],
+                name='groupstats_last_activity'
+            ),
+        ]
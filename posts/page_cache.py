@@ -0,0 +1,83 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from posts.settings import PAGE_CACHE_TIMEOUT
+from yatube import db
+from . import generations
+from .models import Group, Post, User
+
+
+def index_scopes():
+    return [generations.INDEX]
+
+
+def group_scopes(slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True).first()
+    if group_id is not None:
+        return [generations.group_scope(group_id)]
+
+
+def profile_scopes(username):
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True).first()
+    if author_id is not None:
+        return [generations.author_scope(author_id)]
+
+
+def post_scopes(username, post_id):
+    author_id = Post.objects.filter(
+        id=post_id, author__username=username).values_list(
+        'author_id', flat=True).first()
+    if author_id is not None:
+        return [generations.author_scope(author_id),
+                generations.post_scope(post_id)]
+
+
+def cache_anonymous_page(scopes_for):
+    """Serve whole pages to anonymous visitors from the cache.
+
+    ``scopes_for`` receives the view kwargs and names the feeds whose
+    generations the page depends on (``None`` for a missing object, which
+    lets the view answer 404 itself). The generations give a strong ETag
+    and their last change time gives Last-Modified, so a revalidating
+    browser or proxy gets a 304 and a first-time visitor gets the stored
+    response, both without rendering a template.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            scopes = scopes_for(**kwargs)
+            if scopes is None:
+                return view(request, *args, **kwargs)
+            page_generations, modified = generations.state(scopes)
+            version = hashlib.sha1(
+                f'{request.get_full_path()}|{page_generations}'.encode()
+            ).hexdigest()
+            etag = quote_etag(version)
+            last_modified = int(modified)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = cache.get(f'page:{version}')
+            if response is None:
+                # The generations are the primary's: a page read from a
+                # lagging replica would be cached as their current content.
+                db.pin()
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(f'page:{version}', response, PAGE_CACHE_TIMEOUT)
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+import base64
+import binascii
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(date, pk):
+    value = f'{date.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(value).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        value = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        date, pk = value.decode().split('|')
+        date, pk = parse_datetime(date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return date, pk
+
+
+class CursorPaginator(Paginator):
+    """Keyset paginator over a descending (date, id) ordering.
+
+    Pages are addressed by ``?after=``/``?before=`` cursors instead of
+    numbers, so no COUNT(*) and no OFFSET is ever issued and a page stays
+    stable while newer rows are inserted. The stock ``Page`` is returned:
+    its ``number`` is 1 on the first page and 2 on any other, and
+    ``num_pages`` says whether an older page exists, which is all
+    ``has_previous``/``has_next`` look at.
+    """
+    num_pages = 1
+
+    def __init__(self, object_list, per_page, keys=('pub_date', 'id')):
+        super().__init__(object_list, per_page)
+        self.keys = keys
+        self.cursor = None
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    def _older(self, cursor):
+        date_key, pk_key = self.keys
+        date, pk = cursor
+        return (Q(**{f'{date_key}__lt': date})
+                | Q(**{date_key: date, f'{pk_key}__lt': pk}))
+
+    def _newer(self, cursor):
+        date_key, pk_key = self.keys
+        date, pk = cursor
+        return (Q(**{f'{date_key}__gt': date})
+                | Q(**{date_key: date, f'{pk_key}__gt': pk}))
+
+    def _fetch(self, condition=None, newest_first=True):
+        queryset = self.object_list
+        if condition is not None:
+            queryset = queryset.filter(condition)
+        ordering = [key if not newest_first else f'-{key}'
+                    for key in self.keys]
+        return list(queryset.order_by(*ordering)[:self.per_page + 1])
+
+    def _cursor_for(self, item):
+        date_key, pk_key = self.keys
+        return encode_cursor(getattr(item, date_key), getattr(item, pk_key))
+
+    def get_page(self, after=None, before=None):
+        """Return the page older than ``after`` or newer than ``before``.
+
+        Unknown or malformed cursors fall back to the first page.
+        """
+        items, has_previous, has_next = None, False, False
+        before_cursor = decode_cursor(before)
+        after_cursor = decode_cursor(after)
+        if before_cursor is not None:
+            items = self._fetch(self._newer(before_cursor), False)
+            if len(items) > self.per_page:
+                items = items[:self.per_page][::-1]
+                has_previous, has_next = True, True
+                self.cursor = ('before', before)
+            else:
+                items = None
+        elif after_cursor is not None:
+            items = self._fetch(self._older(after_cursor))
+            has_previous = True
+            self.cursor = ('after', after)
+        if items is None:
+            items = self._fetch()
+        if len(items) > self.per_page:
+            items = items[:self.per_page]
+            has_next = True
+        if items and has_previous:
+            self.previous_cursor = self._cursor_for(items[0])
+        if items and has_next:
+            self.next_cursor = self._cursor_for(items[-1])
+        number = 2 if has_previous else 1
+        self.num_pages = number + 1 if has_next else number
+        return self._get_page(items, number, self)
+
+
+def paginate(request, object_list, per_page, keys=('pub_date', 'id')):
+    paginator = CursorPaginator(object_list, per_page, keys)
+    return paginator.get_page(
+        request.GET.get('after'), request.GET.get('before'))
@@ -0,0 +1,104 @@
+"""Who to follow, computed offline from the whole follow graph.
+
+The graph is read once into a compressed sparse row adjacency matrix:
+``users`` holds the ids of everyone who follows somebody in ascending
+order, row ``i`` of the matrix are the authors ``users[i]`` follows,
+``indices[indptr[i]:indptr[i + 1]]``, also sorted. A user's candidates are
+their row of the matrix squared: every author followed by someone they
+follow, scored by the number of such paths, minus the user and the authors
+they already follow. The best ``SUGGESTIONS_NUMBER`` of them are stored as
+``Suggestion`` rows and read back by the (user, rank) index.
+"""
+import heapq
+from array import array
+from collections import Counter, namedtuple
+
+from django.db import transaction
+
+from posts.settings import SUGGESTIONS_NUMBER
+from . import follow_graph
+from .models import Follow, Suggestion
+
+Graph = namedtuple('Graph', 'users indptr indices')
+
+
+def adjacency():
+    """The follow graph as a ``Graph`` of three flat arrays."""
+    users = array(follow_graph.TYPECODE)
+    indptr = array('L', [0])
+    indices = array(follow_graph.TYPECODE)
+    rows = Follow.objects.order_by('user_id', 'author_id').values_list(
+        'user_id', 'author_id')
+    for user_id, author_id in rows.iterator():
+        if not users or users[-1] != user_id:
+            users.append(user_id)
+            indptr.append(indptr[-1])
+        indices.append(author_id)
+        indptr[-1] += 1
+    return Graph(users, indptr, indices)
+
+
+def row(graph, user_id):
+    index, found = follow_graph.position(graph.users, user_id)
+    if not found:
+        return graph.indices[:0]
+    return graph.indices[graph.indptr[index]:graph.indptr[index + 1]]
+
+
+def candidates(graph, user_id, number=SUGGESTIONS_NUMBER):
+    """The ``number`` best (author_id, score) pairs for ``user_id``, most
+    paths first and older accounts first among equals."""
+    following = row(graph, user_id)
+    scores = Counter()
+    for author_id in following:
+        scores.update(row(graph, author_id))
+    scores.pop(user_id, None)
+    for author_id in following:
+        scores.pop(author_id, None)
+    return heapq.nlargest(
+        number, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def suggestions(graph, number=SUGGESTIONS_NUMBER):
+    for user_id in graph.users:
+        for rank, (author_id, score) in enumerate(
+                candidates(graph, user_id, number)):
+            yield Suggestion(user_id=user_id, author_id=author_id,
+                             score=score, rank=rank)
+
+
+@transaction.atomic
+def rebuild(number=SUGGESTIONS_NUMBER, batch_size=1000):
+    """Replace every stored suggestion; returns how many were written.
+
+    Runs in one transaction, so pages keep showing the previous
+    suggestions until the new ones are complete.
+    """
+    graph = adjacency()
+    Suggestion.objects.all().delete()
+    batch = []
+    written = 0
+    for suggestion in suggestions(graph, number):
+        batch.append(suggestion)
+        if len(batch) == batch_size:
+            Suggestion.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    Suggestion.objects.bulk_create(batch)
+    return written + len(batch)
+
+
+def for_user(user, number=SUGGESTIONS_NUMBER):
+    """Stored suggestions for ``user`` with their authors, in one query.
+
+    Authors followed since the last rebuild are dropped using the cached
+    following set.
+    """
+    if not user.is_authenticated:
+        return []
+    stored = list(Suggestion.objects.filter(user=user).select_related(
+        'author')[:number])
+    following = follow_graph.is_following(
+        user, [suggestion.author_id for suggestion in stored])
+    return [suggestion for suggestion in stored
+            if not following[suggestion.author_id]]
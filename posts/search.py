@@ -0,0 +1,94 @@
+"""Full-text search over posts and their comments.
+
+Both are indexed by FTS5 tables created in migration 0017 and kept up to
+date by triggers, so a search costs an index lookup instead of a
+``LIKE '%term%'`` scan of every row.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from posts.settings import (SEARCH_COMMENT_WEIGHT, SEARCH_MAX_TERMS,
+                            SEARCH_RESULTS_LIMIT)
+
+WORD = re.compile(r'\w+')
+INDEXES = ('posts_post_fts', 'posts_comment_fts')
+
+RANKED = '''
+SELECT post_id FROM (
+    SELECT rowid AS post_id, bm25(posts_post_fts) AS score
+    FROM posts_post_fts
+    WHERE posts_post_fts MATCH %s
+    UNION ALL
+    SELECT comment.post_id, bm25(posts_comment_fts) * %s
+    FROM posts_comment_fts
+    JOIN posts_comment AS comment ON comment.id = posts_comment_fts.rowid
+    WHERE posts_comment_fts MATCH %s
+)
+GROUP BY post_id
+ORDER BY MIN(score), post_id DESC
+LIMIT %s
+'''
+
+
+def match_expression(query):
+    """FTS5 query matching posts that contain every word of ``query``.
+
+    Words are quoted, so operators typed by the user are never parsed,
+    and matched as prefixes to catch other forms of the same word.
+    """
+    words = WORD.findall(query.lower())[:SEARCH_MAX_TERMS]
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def ranked_post_ids(query, limit=SEARCH_RESULTS_LIMIT):
+    """Ids of matching posts, best first.
+
+    bm25 scores are negative and lower is better; a match in a comment
+    counts for ``SEARCH_COMMENT_WEIGHT`` of a match in the post itself.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            RANKED,
+            [expression, SEARCH_COMMENT_WEIGHT, expression, limit])
+        return [post_id for post_id, in cursor.fetchall()]
+
+
+def matching_post_ids(query):
+    """Subquery of posts whose own text matches ``query``."""
+    return RawSQL(
+        'SELECT rowid FROM posts_post_fts WHERE posts_post_fts MATCH %s',
+        [match_expression(query)])
+
+
+@contextmanager
+def indexing_deferred():
+    """Stop indexing row by row and rebuild the indexes in one pass.
+
+    For bulk loads: FTS5 indexes a whole table several times faster than
+    its triggers index the same rows one insert at a time. The triggers
+    are recreated from their own definitions on exit, so a process killed
+    inside the block leaves the index without them.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+            f"AND ({' OR '.join(['name LIKE %s'] * len(INDEXES))})",
+            [f'{index}_%' for index in INDEXES])
+        triggers = cursor.fetchall()
+        for name, _ in triggers:
+            cursor.execute(f'DROP TRIGGER {name}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in triggers:
+                cursor.execute(sql)
+            for index in INDEXES:
+                cursor.execute(
+                    f"INSERT INTO {index}({index}) VALUES ('rebuild')")
@@ -0,0 +1,230 @@
+"""Synthetic data for load tests.
+
+Activity follows power laws, as on real social sites: a few authors write
+most of the posts, a few posts collect most of the comments and a few
+users have most of the followers. Everything is drawn from one seeded
+generator, so the same options and seed give the same database.
+
+Posts, comments and follows are written with plain ``executemany``
+inserts: building and compiling a model instance per row costs several
+times more than SQLite needs to store it.
+"""
+import datetime as dt
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Comment, Follow, Group, Post, User
+from .transfer import Progress
+
+WORDS = (
+    'лето', 'город', 'новый', 'день', 'кот', 'дорога', 'книга', 'море',
+    'друзья', 'музыка', 'вечер', 'утро', 'работа', 'проект', 'фото',
+    'горы', 'река', 'поезд', 'кофе', 'дождь', 'солнце', 'снег', 'парк',
+    'концерт', 'фильм', 'встреча', 'идея', 'план', 'отпуск', 'дом',
+    'сегодня', 'вчера', 'завтра', 'очень', 'просто', 'наконец', 'снова',
+    'хороший', 'странный', 'тихий', 'шумный', 'длинный', 'короткий',
+    'смотрел', 'читал', 'слушал', 'гулял', 'думал', 'писал', 'ехал',
+)
+TEXT_POOL_SIZE = 5000
+# A prime larger than any table, so multiplying by it permutes indexes.
+SCATTER_PRIME = 1_000_000_007
+
+
+def power_law(rng, n, alpha):
+    """Random index in ``range(n)``, index k drawn with P ~ (k+1)^-alpha.
+
+    Inverse transform of a continuous bounded power law, so it takes
+    constant time and memory whatever ``n`` is.
+    """
+    u = rng.random()
+    if alpha == 1:
+        x = (n + 1) ** u
+    else:
+        x = (1 - u * (1 - (n + 1) ** (1 - alpha))) ** (1 / (1 - alpha))
+    return min(int(x) - 1, n - 1)
+
+
+def scatter(index, n, shift=0):
+    """Spread popularity ranks over ``range(n)``.
+
+    Without it the most active authors and the most commented posts
+    would all sit at the start of their tables. Different ``shift``
+    values give unrelated orders of the same rows.
+    """
+    return (index * SCATTER_PRIME + shift) % n
+
+
+class Seeder:
+    def __init__(self, seed=0, alpha=1.2, batch_size=20000, days=365,
+                 write=print):
+        self.rng = random.Random(seed)
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.write = write
+        self.until = timezone.now()
+        self.since = self.until - dt.timedelta(days=days)
+        self.password = make_password(None)
+        self.user_ids = []
+        self.group_ids = []
+        self.first_post_id = None
+        self.posts_count = 0
+        self.texts = {}
+
+    def batches(self, label, rows):
+        progress = Progress(label, self.write)
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                yield batch
+            progress.tick(len(batch))
+        progress.report()
+
+    def create(self, label, model, objects):
+        for batch in self.batches(label, objects):
+            model.objects.bulk_create(batch)
+
+    def insert(self, label, model, columns, rows, ignore_conflicts=False):
+        """Insert tuples of database values into ``columns``."""
+        ops = connection.ops
+        sql = (
+            f'{ops.insert_statement(ignore_conflicts=ignore_conflicts)} '
+            f'{ops.quote_name(model._meta.db_table)} '
+            f'({", ".join(map(ops.quote_name, columns))}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts)}'
+        )
+        with connection.cursor() as cursor:
+            if (connection.vendor == 'sqlite'
+                    and not connection.in_atomic_block):
+                # Waiting for fsync on every batch would halve the rate;
+                # a seed interrupted by a crash is simply run again.
+                cursor.execute('PRAGMA synchronous=OFF')
+            for batch in self.batches(label, rows):
+                cursor.executemany(sql, batch)
+
+    def new_ids(self, model, start):
+        return list(model.objects.filter(pk__gt=start).order_by(
+            'pk').values_list('pk', flat=True))
+
+    def text(self, low, high):
+        """Random text of ``low`` to ``high`` words.
+
+        Texts are drawn from a pool, because composing a new one for
+        every row would take longer than inserting it.
+        """
+        pool = self.texts.get((low, high))
+        if pool is None:
+            pool = self.texts[low, high] = [
+                ' '.join(self.rng.choices(
+                    WORDS, k=self.rng.randint(low, high))).capitalize()
+                for _ in range(TEXT_POOL_SIZE)
+            ]
+        return self.rng.choice(pool)
+
+    def user(self, popular=False):
+        """Id of a random user, the active ones more often.
+
+        With ``popular`` the most followed users are favoured instead;
+        they are not the ones who write the most, otherwise every
+        timeline would be filled by the same few authors.
+        """
+        count = len(self.user_ids)
+        return self.user_ids[scatter(
+            power_law(self.rng, count, self.alpha), count,
+            count // 2 if popular else 0)]
+
+    def post_date(self, number):
+        # Posts are spread evenly over the period, oldest first.
+        return self.since + (self.until - self.since) * (
+            (number + 0.5) / self.posts_count)
+
+    def database_date(self, date):
+        return connection.ops.adapt_datetimefield_value(date)
+
+    def create_users(self, count):
+        start = User.objects.aggregate(Max('pk'))['pk__max'] or 0
+        self.create('users', User, (
+            User(username=f'user{start + number}', password=self.password)
+            for number in range(1, count + 1)
+        ))
+        self.user_ids = self.new_ids(User, start)
+
+    def create_groups(self, count):
+        start = Group.objects.aggregate(Max('pk'))['pk__max'] or 0
+        self.create('groups', Group, (
+            Group(title=f'Сообщество {start + number}',
+                  slug=f'group-{start + number}',
+                  description=self.text(5, 20))
+            for number in range(1, count + 1)
+        ))
+        self.group_ids = self.new_ids(Group, start)
+
+    def create_posts(self, count, grouped=0.7):
+        self.first_post_id = (
+            Post.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+        self.posts_count = count
+        groups = len(self.group_ids)
+
+        def posts():
+            for number in range(count):
+                group_id = None
+                if groups and self.rng.random() < grouped:
+                    group_id = self.group_ids[scatter(
+                        power_law(self.rng, groups, self.alpha), groups)]
+                yield (self.first_post_id + number,
+                       self.text(5, 60),
+                       self.database_date(self.post_date(number)),
+                       self.user(),
+                       group_id,
+                       0)
+
+        self.insert('posts', Post, (
+            'id', 'text', 'pub_date', 'author_id', 'group_id',
+            'comments_count',
+        ), posts())
+
+    def create_comments(self, count):
+        def comments():
+            for _ in range(count):
+                number = scatter(
+                    power_law(self.rng, self.posts_count, self.alpha),
+                    self.posts_count)
+                created = self.post_date(number) + dt.timedelta(
+                    hours=self.rng.expovariate(1 / 12))
+                yield (self.first_post_id + number,
+                       self.user(),
+                       self.text(1, 20),
+                       self.database_date(min(created, self.until)))
+
+        if self.posts_count:
+            self.insert('comments', Comment, (
+                'post_id', 'author_id', 'text', 'created',
+            ), comments())
+
+    def create_follows(self, average):
+        """Each user follows a power-law number of popular authors.
+
+        About ``average`` of them per user on the whole.
+        """
+        users = len(self.user_ids)
+
+        def follows():
+            for user_id in self.user_ids:
+                wanted = min(
+                    int(self.rng.paretovariate(2) * average / 2), users - 1)
+                authors = {self.user(popular=True) for _ in range(wanted)}
+                authors.discard(user_id)
+                for author_id in sorted(authors):
+                    yield user_id, author_id
+
+        if users > 1:
+            self.insert('follows', Follow, ('user_id', 'author_id'),
+                        follows(), ignore_conflicts=True)
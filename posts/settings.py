@@ -1,2 +1,30 @@
 POSTS_NUMBER = 10
 PROFILE_POSTS_NUMBER = 5
+FANOUT_FOLLOWERS_LIMIT = 5000
+TIMELINE_BACKFILL_LIMIT = 1000
+TIMELINE_BATCH_SIZE = 500
+PAGE_CACHE_TIMEOUT = 60 * 60 * 6
+THUMBNAIL_GEOMETRIES = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_QUEUE_TIMEOUT = 60 * 5
+IMAGE_MAX_SIZE = (2560, 2560)
+IMAGE_QUALITY = 85
+RENDITION_SIZE = (1280, 1280)
+RENDITION_QUALITY = 80
+SEARCH_RESULTS_LIMIT = 1000
+SEARCH_MAX_TERMS = 10
+SEARCH_COMMENT_WEIGHT = 0.5
+POST_CARD_TIMEOUT = 60 * 60 * 24
+COMMENTS_NUMBER = 20
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24
+SUGGESTIONS_NUMBER = 5
+WRITE_BATCH_SIZE = 100
+WRITE_TICK = 0.002
+TRENDING_POSTS_NUMBER = 20
+TRENDING_HALF_LIFE = 60 * 60 * 6
+TRENDING_MIN_SCORE = 0.01
+GROUPS_NUMBER = 20
+GROUP_RECENT_AUTHORS = 5
+GROUP_RECENT_SCAN = 100
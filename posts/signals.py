@@ -0,0 +1,171 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import (counters, follow_graph, generations, group_stats, timeline,
+               trending)
+from .models import (AuthorStats, Comment, Follow, Group, GroupStats, Post,
+                     User)
+
+
+def only_login(update_fields):
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, raw, update_fields, **kwargs):
+    # Names are shown on every page with the user's posts or comments.
+    instance.renamed = not (
+        raw or instance.pk is None or only_login(update_fields)
+    ) and User.objects.filter(pk=instance.pk).exclude(
+        username=instance.username, first_name=instance.first_name,
+        last_name=instance.last_name).exists()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw, update_fields, **kwargs):
+    if raw:
+        return
+    if created:
+        AuthorStats.objects.get_or_create(author=instance)
+    if only_login(update_fields):
+        return
+    scopes = [generations.author_scope(instance.id)]
+    if getattr(instance, 'renamed', False):
+        group_ids = set(Post.objects.filter(
+            author=instance, group__isnull=False).values_list(
+                'group_id', flat=True))
+        post_ids = set(Comment.objects.filter(author=instance).values_list(
+            'post_id', flat=True))
+        # Feeds, group pages and the groups directory show the name, and
+        # so do the posts the user commented on.
+        scopes += generations.post_scopes(instance.id, *group_ids)
+        scopes += [generations.post_scope(pk) for pk in post_ids]
+        for group_id in group_ids:
+            group_stats.refresh(group_id)
+    generations.bump(*scopes)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+    author_ids = set() if created else group_author_ids(instance)
+    bump_group_pages(instance, author_ids)
+
+
+def group_author_ids(group):
+    return set(group.posts.values_list('author_id', flat=True))
+
+
+def bump_group_pages(group, author_ids):
+    # The groups directory is cached under the index generation, and the
+    # profiles and post pages of the group's posts show its title.
+    generations.bump(
+        generations.group_scope(group.id), generations.INDEX,
+        *[generations.author_scope(pk) for pk in author_ids])
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # Posts of the group lose it through SET_NULL, which sends no signals
+    # and leaves none of them pointing at the group after the delete.
+    instance.author_ids = group_author_ids(instance)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump_group_pages(instance, getattr(instance, 'author_ids', ()))
+
+
+def bump_post_feeds(post_id, modified=None):
+    post = Post.objects.filter(pk=post_id).values(
+        'author_id', 'group_id').first()
+    if post is not None:
+        generations.bump(
+            generations.post_scope(post_id),
+            *generations.post_scopes(post['author_id'], post['group_id']),
+            modified=modified
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    loaded_group_id = getattr(instance, 'loaded_group_id', None)
+    if created:
+        counters.change_author(instance.author_id, posts_count=1)
+        timeline.fan_out(instance)
+        if instance.group_id is not None:
+            group_stats.post_added(instance)
+    elif loaded_group_id != instance.group_id:
+        trending.post_moved(instance)
+        if loaded_group_id is not None:
+            group_stats.post_removed(loaded_group_id)
+        if instance.group_id is not None:
+            group_stats.post_added(instance)
+    generations.bump(
+        generations.post_scope(instance.id),
+        *generations.post_scopes(
+            instance.author_id,
+            instance.group_id,
+            loaded_group_id,
+        ),
+        modified=instance.pub_date if created else None
+    )
+    instance.loaded_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_author(instance.author_id, posts_count=-1)
+    if instance.group_id is not None:
+        group_stats.post_removed(instance.group_id)
+    generations.bump(
+        generations.post_scope(instance.id),
+        *generations.post_scopes(instance.author_id, instance.group_id)
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        counters.change_post(instance.post_id, comments_count=1)
+        trending.comment_added(instance)
+        bump_post_feeds(instance.post_id, instance.created)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_post(instance.post_id, comments_count=-1)
+    trending.comment_removed(instance)
+    bump_post_feeds(instance.post_id)
+
+
+def bump_follow_profiles(follow):
+    # Both author cards show follower/following counters.
+    generations.bump(
+        generations.author_scope(follow.author_id),
+        generations.author_scope(follow.user_id),
+    )
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        counters.follow_changed(instance, 1)
+        follow_graph.changed(instance)
+        timeline.backfill(instance.user_id, instance.author_id)
+        bump_follow_profiles(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.follow_changed(instance, -1)
+    follow_graph.changed(instance)
+    timeline.prune(instance.user_id, instance.author_id)
+    timeline.follower_lost(instance.author_id)
+    bump_follow_profiles(instance)
@@ -0,0 +1,17 @@
+from django import template
+
+from posts import thumbnails
+from yatube.timing import timed
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(post, alias):
+    with timed('thumbnail'):
+        url = thumbnails.url(post.image.name, alias)
+        if url is None:
+            thumbnails.queue(post)
+            post.thumbnail_pending = True
+            return (post.image_compact or post.image).url
+    return url
@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, tag
+
+from posts import benchmark
+from posts.models import Comment, Follow, Group, Post, User
+
+pytestmark = pytest.mark.benchmark
+
+
+@tag('benchmark')
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        post = Post.objects.create(
+            text='Про кота', author=cls.author, group=group)
+        Comment.objects.create(post=post, author=cls.reader, text='Мяу')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_route_is_measured(self):
+        report = benchmark.Runner(requests=3, warmup=1).run(
+            benchmark.routes())
+        self.assertEqual(set(report['routes']), {
+            'index', 'search', 'group_posts', 'profile', 'post',
+            'post_comments', 'post_edit', 'trending', 'group_trending',
+            'groups', 'follow_index', 'new_post', 'add_comment',
+            'profile_follow', 'profile_unfollow',
+        })
+        for name, stats in report['routes'].items():
+            with self.subTest(route=name):
+                self.assertEqual(stats['requests'], 3)
+                self.assertEqual(stats['errors'], 0)
+                self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        # Anonymous pages come from the page cache after the warmup.
+        self.assertEqual(report['routes']['index']['queries'], 0)
+        self.assertGreater(report['routes']['follow_index']['queries'], 0)
+        self.assertEqual(Post.objects.filter(author=self.reader).count(), 4)
+
+    def test_routes_can_be_chosen(self):
+        routes = benchmark.routes(['index', 'post'], authenticated=True)
+        self.assertEqual([route.name for route in routes], ['index', 'post'])
+        self.assertEqual({route.user for route in routes}, {self.reader})
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 0.5), 50)
+        self.assertEqual(benchmark.percentile(values, 0.99), 99)
+        self.assertEqual(benchmark.percentile([7], 0.95), 7)
+
+    def test_compare_flags_slower_routes_and_extra_queries(self):
+        baseline = {'routes': {
+            'index': {'p95_ms': 10.0, 'queries': 3.0},
+            'post': {'p95_ms': 10.0, 'queries': 3.0},
+            'profile': {'p95_ms': 10.0, 'queries': 3.0},
+        }}
+        report = {'routes': {
+            'index': {'p95_ms': 11.0, 'queries': 3.0},
+            'post': {'p95_ms': 13.0, 'queries': 3.0},
+            'profile': {'p95_ms': 10.0, 'queries': 4.0},
+            'search': {'p95_ms': 50.0, 'queries': 9.0},
+        }}
+        regressions = benchmark.compare(report, baseline, threshold=0.2)
+        self.assertEqual(set(regressions), {'post', 'profile'})
+
+    def test_command_saves_results_and_fails_on_regression(self):
+        path = os.path.join(self.directory, 'results.json')
+        call_command('benchmark_routes', routes=['index'], requests=2,
+                     warmup=0, output=path, stdout=StringIO())
+        with open(path, encoding='utf-8') as stream:
+            report = json.load(stream)
+        self.assertEqual(list(report['routes']), ['index'])
+        report['routes']['index']['p95_ms'] = 0
+        benchmark.save(report, path)
+        with self.assertRaises(CommandError):
+            call_command('benchmark_routes', routes=['index'], requests=2,
+                         warmup=0, baseline=path, stdout=StringIO())
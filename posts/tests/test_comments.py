@@ -0,0 +1,84 @@
+import datetime as dt
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Post, User
+from posts.settings import COMMENTS_NUMBER
+
+COMMENTS = COMMENTS_NUMBER * 2 + 5
+
+
+class CommentPagesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Запись', author=cls.author)
+        start = timezone.now() - dt.timedelta(days=1)
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.author,
+                    text=f'Комментарий {number}',
+                    created=start + dt.timedelta(minutes=number))
+            for number in range(COMMENTS)
+        )
+        # bulk_create sends no signals, so the counter is set by hand.
+        Post.objects.filter(pk=cls.post.pk).update(comments_count=COMMENTS)
+        cls.args = (cls.author.username, cls.post.id)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_post_page_shows_newest_comments_only(self):
+        response = self.client.get(reverse('posts:post', args=self.args))
+        comments = list(response.context['comments'])
+        self.assertEqual(len(comments), COMMENTS_NUMBER)
+        self.assertIsNotNone(response.context['next_cursor'])
+        self.assertEqual(comments[0].text, f'Комментарий {COMMENTS - 1}')
+        self.assertContains(
+            response, reverse('posts:post_comments', args=self.args))
+
+    def test_query_count_does_not_grow_with_comments(self):
+        url = reverse('posts:post', args=self.args)
+        self.client.force_login(self.author)
+        self.client.get(url)
+        with self.assertNumQueries(4) as queries:
+            self.client.get(url)
+        self.assertIn(f'LIMIT {COMMENTS_NUMBER}',
+                      queries.captured_queries[-1]['sql'])
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.author, text='Ещё')
+            for _ in range(COMMENTS))
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    def test_older_comments_are_loaded_page_by_page(self):
+        url = reverse('posts:post_comments', args=self.args)
+        texts, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            pages += 1
+            texts += [comment.text for comment in response.context['comments']]
+            url = None
+            if response.context['next_cursor']:
+                url = (reverse('posts:post_comments', args=self.args)
+                       + f'?after={response.context["next_cursor"]}')
+        self.assertEqual(pages, 3)
+        self.assertEqual(texts, [
+            f'Комментарий {number}' for number in reversed(range(COMMENTS))])
+
+    def test_json_format(self):
+        url = reverse('posts:post_comments', args=self.args)
+        first = self.client.get(url, {'format': 'json'}).json()
+        self.assertEqual(len(first['comments']), COMMENTS_NUMBER)
+        self.assertEqual(first['comments'][0]['author'], 'author')
+        second = self.client.get(first['next']).json()
+        self.assertEqual(
+            second['comments'][0]['text'],
+            f'Комментарий {COMMENTS - 1 - COMMENTS_NUMBER}')
+
+    def test_unknown_post(self):
+        response = self.client.get(reverse(
+            'posts:post_comments', args=(self.author.username, 999)))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,43 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Post, User
+from yatube import db
+
+
+class PragmasTest(TestCase):
+    def test_new_connections_are_configured(self):
+        with connection.cursor() as cursor:
+            self.assertEqual(db.pragma(cursor, 'synchronous'), [(1,)])
+            self.assertEqual(db.pragma(cursor, 'busy_timeout'), [(5000,)])
+            self.assertEqual(db.pragma(cursor, 'temp_store'), [(2,)])
+
+
+class MaintainTest(TransactionTestCase):
+    def test_free_pages_are_returned(self):
+        post = Post.objects.create(
+            text='Запись', author=User.objects.create(username='author'))
+        call_command('db_maintain', stdout=StringIO())
+        Comment.objects.bulk_create(
+            [Comment(post=post, author=post.author, text='Текст' * 200)
+             for _ in range(500)])
+        Comment.objects.all().delete()
+        out = StringIO()
+        call_command('db_maintain', stdout=out)
+        self.assertIn('Полная перестройка (VACUUM): False', out.getvalue())
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                db.pragma(cursor, 'auto_vacuum'), [(db.INCREMENTAL,)])
+            self.assertEqual(db.pragma(cursor, 'freelist_count'), [(0,)])
+
+
+class ImmediateTransactionsTest(TransactionTestCase):
+    def test_transactions_take_the_write_lock_at_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                User.objects.create(username='author')
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from posts import follow_graph
+from posts.models import AuthorStats, Follow, User
+from yatube import db
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create(username='reader')
+        cls.authors = [User.objects.create(username=f'author{number}')
+                       for number in range(4)]
+        for author in cls.authors[::2]:
+            Follow.objects.create(user=cls.reader, author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_batch_lookup_reads_the_database_once(self):
+        ids = [author.id for author in self.authors]
+        with self.assertNumQueries(1):
+            follow_graph.is_following(self.reader, ids)
+        with self.assertNumQueries(0):
+            following = follow_graph.is_following(self.reader, self.authors)
+        self.assertEqual(following, dict(zip(ids, [True, False] * 2)))
+
+    def test_writes_make_the_cached_set_reload(self):
+        follow_graph.following_ids(self.reader)
+        Follow.objects.create(user=self.reader, author=self.authors[1])
+        Follow.objects.filter(author=self.authors[0]).delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(follow_graph.following_ids(self.reader)),
+                [self.authors[1].id, self.authors[2].id])
+        with self.assertNumQueries(0):
+            follow_graph.following_ids(self.reader)
+
+    def test_rolled_back_follow_is_not_cached(self):
+        follow_graph.following_ids(self.reader)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Follow.objects.create(
+                    user=self.reader, author=self.authors[1])
+                raise RuntimeError
+        self.assertFalse(follow_graph.follows(self.reader, self.authors[1]))
+
+    def test_set_is_loaded_from_the_primary(self):
+        token = db.current.set(db.State())
+        try:
+            with mock.patch.object(
+                    db.ReplicaRouter, 'db_for_read', return_value='missing'):
+                self.assertEqual(
+                    list(follow_graph.following_ids(self.reader)),
+                    [self.authors[0].id, self.authors[2].id])
+        finally:
+            db.current.reset(token)
+
+    def test_follow_and_unfollow_are_idempotent(self):
+        author = self.authors[1]
+        self.assertTrue(follow_graph.follow(self.reader, author))
+        self.assertFalse(follow_graph.follow(self.reader, author))
+        self.assertEqual(
+            AuthorStats.objects.get(author=author).followers_count, 1)
+        self.assertTrue(follow_graph.unfollow(self.reader, author))
+        self.assertFalse(follow_graph.unfollow(self.reader, author))
+        self.assertEqual(
+            AuthorStats.objects.get(author=author).followers_count, 0)
+
+    def test_views_use_the_graph(self):
+        self.client.force_login(self.reader)
+        author = self.authors[1]
+        profile = reverse('posts:profile', args=(author.username,))
+        self.assertFalse(self.client.get(profile).context['following'])
+        for _ in range(2):
+            self.client.get(
+                reverse('posts:profile_follow', args=(author.username,)))
+        self.assertTrue(self.client.get(profile).context['following'])
+        self.assertEqual(
+            Follow.objects.filter(user=self.reader, author=author).count(),
+            1)
+        for _ in range(2):
+            response = self.client.get(
+                reverse('posts:profile_unfollow', args=(author.username,)))
+            self.assertEqual(response.status_code, 302)
+        self.assertFalse(self.client.get(profile).context['following'])
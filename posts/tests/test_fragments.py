@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts import fragments
+from posts.models import Comment, Group, Post, User
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            text='Первая запись', author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def card_keys(self):
+        return [key for key in cache._cache if ':card:' in key]
+
+    def post_card(self, user):
+        self.client.force_login(user)
+        return self.client.get(reverse(
+            'posts:post', args=(self.author.username, self.post.id)
+        )).content.decode()
+
+    def test_cards_are_served_from_the_cache(self):
+        posts = list(Post.objects.for_feed())
+        first = fragments.render_cards(posts, self.reader)
+        key = fragments.card_key(self.post, True, False)
+        self.assertIn('Первая запись', first)
+        self.assertEqual(
+            cache.get(key).replace(fragments.EDIT_SLOT, ''), first)
+        cache.set(key, 'закэшированная карточка')
+        self.assertEqual(
+            fragments.render_cards(posts, self.reader),
+            'закэшированная карточка')
+
+    def test_edit_button_is_shown_to_the_author_only(self):
+        edit_url = reverse(
+            'posts:post_edit', args=(self.author.username, self.post.id))
+        self.assertNotIn(edit_url, self.post_card(self.reader))
+        self.assertIn(edit_url, self.post_card(self.author))
+        # Both saw the same cached card.
+        self.assertEqual(len(self.card_keys()), 1)
+
+    def test_index_shows_the_edit_button_to_the_author_only(self):
+        edit_url = reverse(
+            'posts:post_edit', args=(self.author.username, self.post.id))
+        for user, shown in ((self.author, True), (self.reader, False)):
+            with self.subTest(user=user.username):
+                self.client.force_login(user)
+                html = self.client.get(reverse('posts:index')).content
+                self.assertEqual(edit_url in html.decode(), shown)
+
+    def test_changes_give_a_new_card(self):
+        self.assertIn('Первая запись', self.post_card(self.reader))
+        Post.objects.filter(pk=self.post.pk).update(text='Исправленная')
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        html = self.post_card(self.reader)
+        self.assertIn('Исправленная', html)
+        self.assertIn('Комментариев: 1', html)
+
+    def test_group_name_is_hidden_on_the_group_page(self):
+        html = self.client.get(
+            reverse('posts:group_posts', args=(self.group.slug,))
+        ).content.decode()
+        self.assertIn('Первая запись', html)
+        self.assertNotIn('#Группа', html)
+        self.assertIn('#Группа', fragments.render_cards(
+            Post.objects.for_feed(), self.reader))
@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from posts import generations
+from posts.models import Comment, Group, GroupStats, Post, User
+from posts.tests.utils import committed
+
+
+class GenerationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='writer')
+        cls.group = Group.objects.create(title='group', slug='group')
+        cls.other_group = Group.objects.create(title='other', slug='other')
+
+    def setUp(self):
+        cache.clear()
+
+    def generations(self):
+        return [generations.get(scope) for scope in (
+            generations.INDEX,
+            generations.author_scope(self.user.id),
+            generations.group_scope(self.group.id),
+            generations.group_scope(self.other_group.id),
+        )]
+
+    def test_new_post_and_comment_bump_their_feeds(self):
+        before = self.generations()
+        post = Post.objects.create(
+            text='text', author=self.user, group=self.group)
+        after_post = self.generations()
+        self.assertEqual(
+            [new > old for old, new in zip(before, after_post)],
+            [True, True, True, False])
+        Comment.objects.create(post=post, author=self.user, text='text')
+        self.assertEqual(
+            [new > old for old, new in zip(after_post, self.generations())],
+            [True, True, True, False])
+
+    def test_moving_post_bumps_both_groups(self):
+        Post.objects.create(text='text', author=self.user, group=self.group)
+        before = self.generations()
+        post = Post.objects.get()
+        post.group = self.other_group
+        post.save()
+        self.assertTrue(all(
+            new > old for old, new in zip(before, self.generations())))
+
+    def test_generations_move_again_when_the_write_commits(self):
+        with committed():
+            with transaction.atomic():
+                Post.objects.create(text='text', author=self.user)
+                during = self.generations()
+        self.assertTrue(all(
+            new > old for old, new in zip(during[:2], self.generations())))
+
+    def test_renaming_a_user_bumps_every_page_with_the_name(self):
+        Post.objects.create(text='text', author=self.user, group=self.group)
+        reader = User.objects.create(username='reader')
+        commented = Post.objects.create(text='text', author=reader)
+        Comment.objects.create(post=commented, author=self.user, text='text')
+        post_scope = generations.post_scope(commented.id)
+        before = self.generations() + [generations.get(post_scope)]
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('password')
+        user.save()
+        unchanged = self.generations() + [generations.get(post_scope)]
+        self.assertEqual(
+            [new > old for old, new in zip(before, unchanged)],
+            [False, True, False, False, False])
+        user.username = 'renamed'
+        user.save()
+        after = self.generations() + [generations.get(post_scope)]
+        self.assertEqual(
+            [new > old for old, new in zip(unchanged, after)],
+            [True, True, True, False, True])
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).authors(), ['renamed'])
+
+    def test_renaming_or_deleting_a_group_bumps_its_authors(self):
+        author_scope = generations.author_scope(self.user.id)
+        for change in ('rename', 'delete'):
+            with self.subTest(change=change):
+                group = Group.objects.create(title=change, slug=change)
+                Post.objects.create(text='text', author=self.user, group=group)
+                before = generations.get(author_scope)
+                if change == 'rename':
+                    group.title = 'Новое название'
+                    group.save()
+                else:
+                    group.delete()
+                self.assertGreater(generations.get(author_scope), before)
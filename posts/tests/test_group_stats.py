@@ -0,0 +1,101 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, GroupStats, Post, User
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = User.objects.create(username='first')
+        cls.second = User.objects.create(username='second')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.other = Group.objects.create(
+            title='Другая', slug='other', description='Описание')
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, author, group=None):
+        return Post.objects.create(
+            text='Запись', author=author, group=group or self.group)
+
+    def stats(self, group=None):
+        return GroupStats.objects.get(group=group or self.group)
+
+    def test_new_posts_update_the_rollup(self):
+        self.assertEqual(self.stats().posts_count, 0)
+        self.post(self.first)
+        self.post(self.second)
+        newest = self.post(self.first)
+        stats = self.stats()
+        self.assertEqual(stats.posts_count, 3)
+        self.assertEqual(stats.last_activity, newest.pub_date)
+        self.assertEqual(stats.authors(), ['first', 'second'])
+
+    def test_deleting_and_moving_posts_refreshes_the_rollup(self):
+        oldest = self.post(self.first)
+        moved = self.post(self.second)
+        newest = self.post(self.second)
+        newest.delete()
+        self.assertEqual(self.stats().last_activity, moved.pub_date)
+        moved = Post.objects.get(pk=moved.pk)
+        moved.group = self.other
+        moved.save()
+        stats = self.stats()
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.last_activity, oldest.pub_date)
+        self.assertEqual(stats.authors(), ['first'])
+        self.assertEqual(self.stats(self.other).authors(), ['second'])
+        moved.group = None
+        moved.save()
+        self.assertEqual(self.stats(self.other).posts_count, 0)
+        self.assertEqual(self.stats(self.other).authors(), [])
+
+    def test_deleting_a_group_drops_its_rollup(self):
+        group = Group.objects.create(
+            title='Удаляемая', slug='deleted', description='Описание')
+        post = self.post(self.first, group)
+        group_id = group.pk
+        group.delete()
+        self.assertFalse(GroupStats.objects.filter(pk=group_id).exists())
+        post.refresh_from_db()
+        self.assertIsNone(post.group)
+        post.delete()
+        self.assertEqual(GroupStats.objects.count(), 2)
+
+    def test_recount_fixes_the_rollup(self):
+        self.post(self.first)
+        GroupStats.objects.filter(group=self.group).update(
+            posts_count=5, recent_authors='')
+        GroupStats.objects.filter(group=self.other).delete()
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(self.stats().posts_count, 1)
+        self.assertEqual(self.stats().authors(), ['first'])
+        self.assertEqual(self.stats(self.other).posts_count, 0)
+
+    def test_groups_page_reads_the_rollup(self):
+        self.post(self.first, self.other)
+        self.post(self.second)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:groups'))
+        self.assertEqual(
+            [stats.group for stats in response.context['page']],
+            [self.group, self.other])
+        self.assertContains(response, 'second')
+
+    @mock.patch('posts.views.GROUPS_NUMBER', 1)
+    def test_groups_page_is_paginated(self):
+        self.post(self.first)
+        page = self.client.get(reverse('posts:groups')).context['page']
+        self.assertEqual([stats.group for stats in page], [self.group])
+        self.assertTrue(page.has_next())
+        page = self.client.get(reverse('posts:groups'), {
+            'after': page.paginator.next_cursor}).context['page']
+        self.assertEqual([stats.group for stats in page], [self.other])
@@ -0,0 +1,120 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts import images
+from posts.forms import PostForm
+from posts.models import User
+
+
+def upload(name, size, image_format, orientation=None, **params):
+    buffer = BytesIO()
+    image = Image.new('RGB', size, (200, 30, 30))
+    if orientation is not None:
+        exif = Image.Exif()
+        exif[images.ORIENTATION] = orientation
+        params['exif'] = exif.tobytes()
+    image.save(buffer, image_format, **params)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def animated_gif():
+    buffer = BytesIO()
+    frames = [Image.new('P', (4, 3), color) for color in (1, 2)]
+    frames[0].save(buffer, 'GIF', save_all=True, append_images=frames[1:])
+    return SimpleUploadedFile('moving.gif', buffer.getvalue())
+
+
+class IngestTest(TestCase):
+    def test_small_upload_is_stored_as_is(self):
+        file = upload('small.png', (40, 30), 'PNG')
+        ingested = images.ingest(file)
+        self.assertIs(ingested.original, file)
+        self.assertEqual((ingested.width, ingested.height), (40, 30))
+        self.assertIsNotNone(ingested.rendition)
+
+    @mock.patch.object(images, 'IMAGE_MAX_SIZE', (100, 100))
+    def test_rotated_oversized_photo_is_normalised(self):
+        ingested = images.ingest(
+            upload('photo.jpg', (400, 200), 'JPEG', orientation=6))
+        self.assertEqual((ingested.width, ingested.height), (50, 100))
+        stored = Image.open(ingested.original)
+        self.assertEqual(stored.size, (50, 100))
+        self.assertIsNone(stored.getexif().get(images.ORIENTATION))
+        self.assertEqual(ingested.original.name, 'photo.jpg')
+
+    @mock.patch.object(images, 'RENDITION_SIZE', (20, 20))
+    def test_rendition_is_compact(self):
+        ingested = images.ingest(upload('small.png', (40, 30), 'PNG'))
+        rendition = Image.open(ingested.rendition)
+        self.assertEqual(rendition.format, images.RENDITION_FORMAT)
+        self.assertEqual(rendition.size, (20, 15))
+
+    def test_animation_is_kept(self):
+        file = animated_gif()
+        ingested = images.ingest(file)
+        self.assertIs(ingested.original, file)
+        self.assertIsNone(ingested.rendition)
+        self.assertEqual((ingested.width, ingested.height), (4, 3))
+
+
+class PostFormImageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = override_settings(
+            MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+        cls.media.enable()
+        cls.user = User.objects.create(username='photographer')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        cls.media.disable()
+        super().tearDownClass()
+
+    def test_sizes_and_rendition_are_saved(self):
+        form = PostForm(
+            {'text': 'Фото'},
+            {'image': upload('photo.jpg', (60, 40), 'JPEG')})
+        self.assertTrue(form.is_valid(), form.errors)
+        post = form.save(commit=False)
+        post.author = self.user
+        post.save()
+        self.assertEqual((post.image_width, post.image_height), (60, 40))
+        self.assertTrue(post.image.name.startswith('posts/photo'))
+        self.assertTrue(post.image_compact.name.startswith(
+            'posts/photo_compact'))
+        self.assertTrue(post.image_compact.storage.exists(
+            post.image_compact.name))
+
+    def test_truncated_upload_is_rejected(self):
+        photo = upload('photo.jpg', (600, 400), 'JPEG')
+        form = PostForm(
+            {'text': 'Фото'},
+            {'image': SimpleUploadedFile(
+                'photo.jpg', photo.read()[:photo.size // 2])})
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    def test_clearing_the_image_clears_its_sizes(self):
+        form = PostForm(
+            {'text': 'Фото'},
+            {'image': upload('photo.jpg', (60, 40), 'JPEG')})
+        form.is_valid()
+        post = form.save(commit=False)
+        post.author = self.user
+        post.save()
+        form = PostForm(
+            {'text': 'Без фото', 'image-clear': 'on'}, instance=post)
+        self.assertTrue(form.is_valid(), form.errors)
+        post = form.save()
+        self.assertFalse(post.image)
+        self.assertFalse(post.image_compact)
+        self.assertIsNone(post.image_width)
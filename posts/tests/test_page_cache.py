@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, User
+
+HOME_URL = reverse('posts:index')
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='writer')
+        cls.reader = User.objects.create(username='reader')
+        cls.post = Post.objects.create(text='Первая запись', author=cls.user)
+        cls.PROFILE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.user.username})
+        cls.POST_URL = reverse('posts:post', kwargs={
+            'username': cls.user.username, 'post_id': cls.post.id})
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_pages_carry_validators(self):
+        for url in (HOME_URL, self.PROFILE_URL, self.POST_URL):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertIn('ETag', response)
+                self.assertIn('Last-Modified', response)
+                self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.guest_client.get(HOME_URL)['ETag']
+        response = self.guest_client.get(HOME_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_second_visit_is_served_without_rendering(self):
+        first = self.guest_client.get(HOME_URL)
+        second = Client().get(HOME_URL)
+        self.assertIsNotNone(first.context)
+        self.assertIsNone(second.context)
+        self.assertEqual(second.content, first.content)
+
+    def test_writes_change_the_etag(self):
+        writes = (
+            lambda: Post.objects.create(text='Вторая', author=self.user),
+            lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Ответ'),
+            lambda: Follow.objects.create(user=self.reader, author=self.user),
+        )
+        for url in (self.PROFILE_URL, self.POST_URL):
+            etag = self.guest_client.get(url)['ETag']
+            for write in writes:
+                write()
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200, url)
+                self.assertNotEqual(response['ETag'], etag)
+                etag = response['ETag']
+            Follow.objects.all().delete()
+
+    def test_authenticated_users_bypass_the_cache(self):
+        self.guest_client.get(HOME_URL)
+        response = self.authorized_client.get(HOME_URL)
+        self.assertIsNotNone(response.context)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+EXTRA_ITEMS = 4
+
+
+class FeedQueryCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='writer')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='group', slug='group')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(
+            text='text', author=cls.author, group=cls.group)
+        Comment.objects.create(post=cls.post, author=cls.reader, text='1')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.urls = [
+            reverse('posts:index'),
+            reverse('posts:group_posts', args=(cls.group.slug,)),
+            reverse('posts:profile', args=(cls.author.username,)),
+            reverse('posts:follow_index'),
+            reverse('posts:post', args=(cls.author.username, cls.post.id)),
+        ]
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.reader_client.get(url)
+        return len(context)
+
+    def test_query_count_does_not_grow_with_page(self):
+        before = {url: self.count_queries(url) for url in self.urls}
+        for number in range(EXTRA_ITEMS):
+            author = User.objects.create(username=f'writer_{number}')
+            Follow.objects.create(user=self.reader, author=author)
+            Post.objects.create(text='text', author=author, group=self.group)
+            Post.objects.create(text='text', author=self.author)
+            Comment.objects.create(post=self.post, author=author, text='2')
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), before[url])
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.settings import POSTS_NUMBER
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scan_with_sort(plan):
+    full_scan = any(
+        step.startswith('SCAN') and 'USING' not in step for step in plan)
+    temp_sort = any('TEMP B-TREE' in step for step in plan)
+    return full_scan and temp_sort
+
+
+class QueryPlanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='writer')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='group', slug='group')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for _ in range(POSTS_NUMBER + 1):
+            cls.post = Post.objects.create(
+                text='text', author=cls.author, group=cls.group)
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text='text')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def assert_plans_use_indexes(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            page = self.reader_client.get(url).context.get('page')
+        if page is not None and page.has_next():
+            with CaptureQueriesContext(connection) as next_context:
+                self.reader_client.get(
+                    f'{url}?after={page.paginator.next_cursor}')
+            context.captured_queries.extend(next_context.captured_queries)
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            plan = query_plan(query['sql'])
+            self.assertFalse(
+                full_scan_with_sort(plan), f'{query["sql"]}\n{plan}')
+
+    def test_feed_queries_use_indexes(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_posts', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+            reverse('posts:post', args=(self.author.username, self.post.id)),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_plans_use_indexes(url)
@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts import recommendations
+from posts.models import Follow, Suggestion, User
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {name: User.objects.create(username=name)
+                     for name in ('reader', 'friend', 'other', 'popular',
+                                  'niche', 'lonely')}
+        for user, author in (('reader', 'friend'), ('reader', 'other'),
+                             ('friend', 'popular'), ('other', 'popular'),
+                             ('friend', 'niche'), ('friend', 'reader'),
+                             ('other', 'friend')):
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author])
+
+    def setUp(self):
+        cache.clear()
+
+    def names(self, pairs):
+        ids = {user.id: name for name, user in self.users.items()}
+        return [(ids[author_id], score) for author_id, score in pairs]
+
+    def test_adjacency_rows_are_sorted_follows(self):
+        graph = recommendations.adjacency()
+        reader, friend = self.users['reader'], self.users['friend']
+        self.assertEqual(list(recommendations.row(graph, reader.id)),
+                         sorted([friend.id, self.users['other'].id]))
+        self.assertEqual(
+            len(recommendations.row(graph, self.users['lonely'].id)), 0)
+
+    def test_two_hop_candidates_skip_self_and_followed(self):
+        graph = recommendations.adjacency()
+        self.assertEqual(
+            self.names(recommendations.candidates(
+                graph, self.users['reader'].id)),
+            [('popular', 2), ('niche', 1)])
+        self.assertEqual(
+            self.names(recommendations.candidates(
+                graph, self.users['reader'].id, 1)),
+            [('popular', 2)])
+
+    def test_command_replaces_stored_suggestions(self):
+        call_command('recommend_follows', stdout=StringIO())
+        Follow.objects.filter(author=self.users['niche']).delete()
+        call_command('recommend_follows', stdout=StringIO())
+        self.assertEqual(
+            list(Suggestion.objects.filter(
+                user=self.users['reader']).values_list(
+                    'author__username', 'rank')),
+            [('popular', 0)])
+
+    def test_pages_show_suggestions_from_one_query(self):
+        recommendations.rebuild()
+        reader = self.users['reader']
+        recommendations.for_user(reader)
+        with self.assertNumQueries(1):
+            suggested = recommendations.for_user(reader)
+        self.assertEqual([suggestion.author.username
+                          for suggestion in suggested], ['popular', 'niche'])
+        self.client.force_login(reader)
+        for url in (reverse('posts:follow_index'),
+                    reverse('posts:profile', args=('reader',))):
+            response = self.client.get(url)
+            self.assertContains(response, 'На кого подписаться')
+            self.assertEqual(len(response.context['suggestions']), 2)
+        Follow.objects.create(user=reader, author=self.users['popular'])
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual([suggestion.author.username
+                          for suggestion in response.context['suggestions']],
+                         ['niche'])
+        response = self.client.get(reverse('posts:profile', args=('other',)))
+        self.assertEqual(response.context['suggestions'], [])
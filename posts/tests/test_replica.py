@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts import page_cache
+from posts.models import Post, User
+from yatube import db
+
+
+class ReplicaRouterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create(username='reader')
+        cls.author = User.objects.create(username='author')
+        Post.objects.create(text='Запись', author=cls.author)
+
+    def setUp(self):
+        self.router = db.ReplicaRouter()
+        self.router.replica = db.REPLICA
+
+    def route(self, state):
+        token = db.current.set(state)
+        try:
+            return self.router.db_for_read(Post)
+        finally:
+            db.current.reset(token)
+
+    def test_request_reads_go_to_the_replica_until_a_write(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertEqual(self.route(db.State(pinned=True)), 'default')
+        state = db.State()
+        self.assertEqual(self.route(state), db.REPLICA)
+        token = db.current.set(state)
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        db.current.reset(token)
+        self.assertEqual(self.route(state), 'default')
+
+    def test_router_is_off_without_a_replica(self):
+        token = db.current.set(db.State())
+        self.assertIsNone(db.ReplicaRouter().db_for_read(Post))
+        db.current.reset(token)
+
+    def middleware_state(self, view, **cookies):
+        states = []
+
+        def capture(request):
+            view()
+            states.append(db.current.get())
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.COOKIES.update(cookies)
+        response = db.PrimaryStickinessMiddleware(capture)(request)
+        return states[0], response
+
+    def test_writers_stick_to_the_primary(self):
+        state, response = self.middleware_state(lambda: None)
+        self.assertFalse(state.pinned)
+        self.assertNotIn(db.COOKIE, response.cookies)
+        state, response = self.middleware_state(
+            lambda: self.router.db_for_write(Post))
+        self.assertIn(db.COOKIE, response.cookies)
+        state, _ = self.middleware_state(
+            lambda: None, **{db.COOKIE: response.cookies[db.COOKIE].value})
+        self.assertTrue(state.pinned)
+        state, _ = self.middleware_state(
+            lambda: None, **{db.COOKIE: str(int(time.time()) - 1)})
+        self.assertFalse(state.pinned)
+
+    def test_cached_pages_are_rendered_from_the_primary(self):
+        cache.clear()
+        pinned = []
+
+        @page_cache.cache_anonymous_page(page_cache.index_scopes)
+        def view(request):
+            pinned.append(db.current.get().pinned)
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        for _ in range(2):
+            token = db.current.set(db.State())
+            try:
+                view(request)
+            finally:
+                db.current.reset(token)
+        self.assertEqual(pinned, [True])
+
+    def test_follow_sets_the_cookie(self):
+        self.client.force_login(self.reader)
+        response = self.client.get(
+            reverse('posts:profile_follow', args=('author',)))
+        self.assertIn(db.COOKIE, response.cookies)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(db.COOKIE, response.cookies)
+
+
+class SyncReplicaTest(TransactionTestCase):
+    def test_sync_copies_the_database(self):
+        Post.objects.create(
+            text='Запись', author=User.objects.create(username='author'))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            db.sync_replica(path)
+            with closing(sqlite3.connect(path)) as replica:
+                copied, = replica.execute(
+                    'SELECT COUNT(*) FROM posts_post').fetchone()
+        self.assertEqual(copied, Post.objects.count())
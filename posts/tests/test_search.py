@@ -0,0 +1,68 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import search
+from posts.models import Comment, Post, User
+from posts.settings import POSTS_NUMBER
+
+SEARCH_URL = reverse('posts:search')
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='reader')
+        cls.in_text = Post.objects.create(
+            text='Рыжие коты спят на солнце', author=cls.user)
+        cls.in_comment = Post.objects.create(
+            text='Прогулка по парку', author=cls.user)
+        Comment.objects.create(
+            post=cls.in_comment, author=cls.user, text='Там был рыжий кот')
+        cls.unrelated = Post.objects.create(
+            text='Рецепт борща', author=cls.user)
+
+    def test_post_text_ranks_above_comments(self):
+        self.assertEqual(
+            search.ranked_post_ids('кот'),
+            [self.in_text.id, self.in_comment.id])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(
+            search.ranked_post_ids('коты солнце'), [self.in_text.id])
+        self.assertEqual(search.ranked_post_ids('коты борща'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.unrelated.text = 'Кот съел борщ'
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, search.ranked_post_ids('кот'))
+        self.assertEqual(search.ranked_post_ids('рецепт'), [])
+        Comment.objects.all().delete()
+        self.assertNotIn(self.in_comment.id, search.ranked_post_ids('кот'))
+
+    def test_query_syntax_is_not_interpreted(self):
+        for query in ('"', 'кот OR', 'NOT кот', 'text:кот', '*', ''):
+            with self.subTest(query=query):
+                search.ranked_post_ids(query)
+
+    def test_search_page(self):
+        response = Client().get(SEARCH_URL, {'q': 'кот'})
+        self.assertEqual(
+            list(response.context['page']), [self.in_text, self.in_comment])
+        self.assertEqual(response.context['query'], 'кот')
+
+    def test_search_page_is_paginated(self):
+        Post.objects.bulk_create(
+            Post(text=f'Кот номер {number}', author=self.user)
+            for number in range(POSTS_NUMBER))
+        response = Client().get(SEARCH_URL, {'q': 'кот', 'page': 2})
+        self.assertEqual(len(response.context['page']), 2)
+
+    def test_admin_uses_the_index(self):
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'коты'})
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.in_text])
@@ -0,0 +1,59 @@
+import random
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts import search
+from posts.counters import recount
+from posts.models import Comment, Follow, Group, Post, Timeline, User
+from posts.seeding import power_law, scatter
+
+OPTIONS = {
+    'users': 50, 'groups': 5, 'posts': 400, 'comments': 800, 'follows': 5,
+}
+
+
+class SeedTest(TestCase):
+    def seed(self, seed=0):
+        call_command('seed_yatube', seed=seed, stdout=StringIO(), **OPTIONS)
+
+    def test_sizes_and_derived_data(self):
+        self.seed()
+        self.assertEqual(User.objects.count(), OPTIONS['users'])
+        self.assertEqual(Group.objects.count(), OPTIONS['groups'])
+        self.assertEqual(Post.objects.count(), OPTIONS['posts'])
+        self.assertEqual(Comment.objects.count(), OPTIONS['comments'])
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(Timeline.objects.exists())
+        self.assertFalse(any(recount(fix=False).values()))
+        self.assertTrue(search.ranked_post_ids('кот'))
+        post = Post.objects.create(
+            text='Единственный бегемот', author=User.objects.first())
+        self.assertEqual(search.ranked_post_ids('бегемот'), [post.id])
+
+    def test_same_seed_gives_same_data(self):
+        def snapshot():
+            first = User.objects.order_by('-pk')[
+                OPTIONS['users'] - 1].pk
+            return list(
+                Post.objects.order_by('-pk')[:OPTIONS['posts']]
+                .values_list('text', 'author_id')
+            ), first
+
+        self.seed(seed=7)
+        (posts, first) = snapshot()
+        self.seed(seed=7)
+        (again, second) = snapshot()
+        self.assertEqual(
+            [(text, author - first) for text, author in posts],
+            [(text, author - second) for text, author in again])
+
+    def test_activity_follows_a_power_law(self):
+        rng = random.Random(1)
+        draws = [power_law(rng, 1000, 1.2) for _ in range(20000)]
+        self.assertTrue(all(0 <= index < 1000 for index in draws))
+        self.assertGreater(draws.count(0), draws.count(10) * 5)
+        self.assertEqual(
+            sorted(scatter(index, 1000) for index in range(1000)),
+            list(range(1000)))
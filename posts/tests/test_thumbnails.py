@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import generations, thumbnails
+from posts.models import Post, User
+
+HOME_URL = reverse('posts:index')
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B')
+
+
+class ThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # override_settings resets the storage sorl-thumbnail writes to.
+        cls.media = override_settings(
+            MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+        cls.media.enable()
+        cls.user = User.objects.create(username='painter')
+        cls.post = Post.objects.create(
+            text='Картинка', author=cls.user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        cls.media.disable()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feed_shows_original_until_thumbnail_is_ready(self):
+        self.assertContains(self.client.get(HOME_URL), self.post.image.url)
+        self.assertIsNone(thumbnails.url(self.post.image.name, 'feed'))
+
+    def test_ready_thumbnail_replaces_original(self):
+        self.client.get(HOME_URL)
+        generation = generations.get(generations.INDEX)
+        thumbnails.generate(self.post.image.name, self.post.id)
+        url = thumbnails.url(self.post.image.name, 'feed')
+        self.assertIsNotNone(url)
+        self.assertGreater(generations.get(generations.INDEX), generation)
+        response = self.client.get(HOME_URL)
+        self.assertContains(response, url)
+        self.assertNotContains(response, self.post.image.url)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts import timeline
+from posts.models import Follow, Post, Timeline, User
+
+FOLLOW_URL = reverse('posts:follow_index')
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='reader')
+        cls.author = User.objects.create(username='writer')
+        cls.old_post = Post.objects.create(text='old', author=cls.author)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def test_follow_backfills_timeline(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertTrue(
+            Timeline.objects.filter(
+                user=self.user, post=self.old_post).exists())
+
+    def test_new_post_fans_out_to_followers(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(text='new', author=self.author)
+        self.assertEqual(
+            list(self.authorized_client.get(FOLLOW_URL).context['page']),
+            [post, self.old_post])
+
+    def test_unfollow_prunes_timeline(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,)))
+        self.assertFalse(Timeline.objects.filter(user=self.user).exists())
+        response = self.authorized_client.get(FOLLOW_URL)
+        self.assertEqual(len(response.context['page']), 0)
+
+    def test_celebrity_posts_are_read_on_demand(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        Timeline.objects.all().delete()
+        with mock.patch.object(timeline, 'FANOUT_FOLLOWERS_LIMIT', 0):
+            post = Post.objects.create(text='new', author=self.author)
+            self.assertFalse(Timeline.objects.exists())
+            self.assertEqual(
+                list(timeline.feed(self.user)), [post, self.old_post])
+
+    def test_author_below_the_limit_is_fanned_out_again(self):
+        other = User.objects.create(username='other')
+        with mock.patch.object(timeline, 'FANOUT_FOLLOWERS_LIMIT', 1):
+            Follow.objects.create(user=self.user, author=self.author)
+            Follow.objects.create(user=other, author=self.author)
+            post = Post.objects.create(text='new', author=self.author)
+            Follow.objects.filter(user=other).delete()
+            self.assertEqual(
+                list(timeline.feed(self.user)), [post, self.old_post])
@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube import timing
+
+
+class ServerTimingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='author')
+        Post.objects.create(text='Запись', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def metrics(self, response):
+        return {
+            part.split(';')[0].strip(): part
+            for part in response['Server-Timing'].split(',')
+        }
+
+    @override_settings(TIMING_SAMPLE_RATE=1)
+    def test_sampled_request_reports_sql_cache_and_templates(self):
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            response = self.client.get(reverse('posts:index'))
+        metrics = self.metrics(response)
+        self.assertEqual(
+            set(metrics), {'db', 'cache', 'template', 'total'})
+        self.assertIn('misses', metrics['cache'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], '/')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_calls'], 0)
+        self.assertEqual(record['template_calls'], 1)
+        self.assertGreater(record['cache_misses'], 0)
+
+    @override_settings(TIMING_SAMPLE_RATE=1)
+    def test_cached_page_skips_sql(self):
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            self.client.get(reverse('posts:index'))
+            response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('db', self.metrics(response))
+        self.assertGreater(
+            json.loads(logs.records[1].getMessage())['cache_hits'], 0)
+
+    def test_requests_outside_the_sample_are_not_measured(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class TimedCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = timing.SQLiteCache(
+            os.path.join(self.directory, 'cache.sqlite3'), {})
+        self.timings = timing.Timings()
+        self.token = timing.current.set(self.timings)
+
+    def tearDown(self):
+        timing.current.reset(self.token)
+        self.cache.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_hits_and_misses_are_counted(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+        self.cache.get_many(['key', 'other', 'missing'])
+        self.assertEqual(self.timings.cache_hits, 2)
+        self.assertEqual(self.timings.cache_misses, 3)
+        self.assertEqual(self.timings.metrics['cache'][0], 4)
+
+    def test_nested_calls_are_counted_once(self):
+        locmem = timing.LocMemCache('timing-test', {})
+        locmem.set('key', 'value')
+        # LocMemCache.get_many calls get() for every key.
+        locmem.get_many(['key', 'missing'])
+        self.assertEqual(self.timings.metrics['cache'][0], 2)
+        self.assertEqual(self.timings.cache_hits, 1)
+        self.assertEqual(self.timings.cache_misses, 1)
@@ -0,0 +1,96 @@
+import datetime as dt
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.models import (AuthorStats, Comment, Follow, Group, Post,
+                          Timeline, User)
+
+LONG_AGO = timezone.make_aware(dt.datetime(2020, 1, 2, 3, 4, 5))
+
+
+class TransferTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.path = os.path.join(cls.directory, 'dump.jsonl')
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            text='Старая запись', author=cls.author, group=cls.group)
+        Post.objects.filter(pk=cls.post.pk).update(pub_date=LONG_AGO)
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def export(self):
+        call_command('export_social', self.path, stderr=StringIO())
+        with open(self.path, encoding='utf-8') as stream:
+            return [json.loads(line) for line in stream]
+
+    def load(self, *args):
+        call_command('import_social', self.path, *args, stdout=StringIO())
+
+    def test_export_refers_to_users_and_groups_by_name(self):
+        records = self.export()
+        self.assertEqual(
+            [record['model'] for record in records],
+            ['group', 'post', 'comment', 'follow'])
+        post = records[1]
+        self.assertEqual(post['author'], 'author')
+        self.assertEqual(post['group'], 'group')
+        self.assertEqual(records[3], {
+            'model': 'follow', 'user': 'reader', 'author': 'author'})
+
+    def test_restore_into_empty_database(self):
+        self.export()
+        for model in (Follow, Comment, Post, Group):
+            model.objects.all().delete()
+        User.objects.filter(username='reader').delete()
+        self.load('--keep-ids')
+        post = Post.objects.get()
+        self.assertEqual(post.id, self.post.id)
+        self.assertEqual(post.pub_date, LONG_AGO)
+        self.assertEqual(post.group.slug, 'group')
+        self.assertEqual(post.comments_count, 1)
+        reader = User.objects.get(username='reader')
+        self.assertFalse(reader.has_usable_password())
+        self.assertEqual(post.comments.get().author, reader)
+        self.assertTrue(
+            Timeline.objects.filter(user=reader, post=post).exists())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 1)
+
+    def test_import_next_to_existing_data_shifts_ids(self):
+        self.export()
+        self.load()
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        copy = Post.objects.exclude(pk=self.post.pk).get()
+        self.assertEqual(copy.text, self.post.text)
+        self.assertEqual(copy.comments.get().text, 'Комментарий')
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, 2)
+
+    def test_broken_dump_is_reported(self):
+        with open(self.path, 'w', encoding='utf-8') as stream:
+            stream.write('{"model": "comment", "id": 1, "post": 999, '
+                         '"author": "reader", "text": "x", '
+                         '"created": "2020-01-01T00:00:00+00:00"}\n')
+        with self.assertRaises(CommandError):
+            self.load()
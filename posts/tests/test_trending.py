@@ -0,0 +1,97 @@
+import datetime as dt
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Group, Post, PostScore, User
+from posts.settings import TRENDING_HALF_LIFE
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Запись {number}', author=cls.author,
+                group=cls.group if number else None)
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+
+    def comment(self, post, half_lives_ago=0):
+        moment = self.now - dt.timedelta(
+            seconds=TRENDING_HALF_LIFE * half_lives_ago)
+        with mock.patch('django.utils.timezone.now', return_value=moment):
+            return Comment.objects.create(
+                post=post, author=self.author, text='Комментарий')
+
+    def score(self, post):
+        return trending.score(
+            PostScore.objects.get(post=post).hotness, self.now)
+
+    def test_comments_add_decayed_weights(self):
+        first, second, third = self.posts
+        self.comment(first, 1)
+        self.comment(first, 1)
+        self.comment(second)
+        self.comment(third, 2)
+        self.assertAlmostEqual(self.score(first), 1)
+        self.assertAlmostEqual(self.score(second), 1)
+        self.assertAlmostEqual(self.score(third), 0.25)
+        self.comment(first)
+        self.assertAlmostEqual(self.score(first), 2)
+        self.assertEqual(list(trending.top()), [first, second, third])
+        self.assertEqual(list(trending.top(self.group)), [second, third])
+
+    def test_deleting_comments_takes_their_weight_back(self):
+        post = self.posts[0]
+        old, new = self.comment(post, 1), self.comment(post)
+        new.delete()
+        self.assertAlmostEqual(self.score(post), 0.5)
+        old.delete()
+        self.assertFalse(PostScore.objects.exists())
+
+    def test_moving_a_post_moves_its_score(self):
+        post = Post.objects.get(pk=self.posts[0].pk)
+        self.comment(post)
+        post.group = self.group
+        post.save()
+        self.assertEqual(list(trending.top(self.group)), [post])
+
+    def test_rebuild_matches_and_expire_drops_quiet_posts(self):
+        first, second, _ = self.posts
+        self.comment(first, 20)
+        self.comment(second)
+        self.comment(second, 1)
+        incremental = dict(PostScore.objects.values_list('post', 'hotness'))
+        call_command('decay_trending', '--rebuild', stdout=StringIO())
+        rebuilt = dict(PostScore.objects.values_list('post', 'hotness'))
+        self.assertEqual(set(rebuilt), {second.id})
+        self.assertAlmostEqual(rebuilt[second.id], incremental[second.id])
+
+    def test_trending_pages(self):
+        first, second, _ = self.posts
+        self.comment(first)
+        self.comment(second)
+        self.comment(second)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(list(response.context['posts']), [second, first])
+        response = self.client.get(
+            reverse('posts:group_trending', args=('group',)))
+        self.assertEqual(list(response.context['posts']), [second])
+        response = self.client.get(
+            reverse('posts:group_trending', args=('missing',)))
+        self.assertEqual(response.status_code, 404)
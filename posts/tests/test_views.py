@@ -125,7 +125,7 @@ class PostViewsTest(TestCase):
 
     def test_cache_page_index(self):
         response_1 = self.guest_client.get(HOME_URL)
-        Post.objects.all().delete()
+        Post.objects.update(text='Без сигналов')
         self.assertEqual(
             self.guest_client.get(HOME_URL).content, response_1.content
         )
@@ -133,6 +133,15 @@ class PostViewsTest(TestCase):
         response_2 = self.guest_client.get(HOME_URL)
         self.assertNotEqual(response_2.content, response_1.content)
 
+    def test_index_cache_is_invalidated_by_writes(self):
+        response_1 = self.guest_client.get(HOME_URL)
+        Post.objects.create(text='Свежая запись', author=self.user_2)
+        response_2 = self.guest_client.get(HOME_URL)
+        self.assertNotEqual(response_2.content, response_1.content)
+        self.assertContains(response_2, 'Свежая запись')
+        Post.objects.all().delete()
+        self.assertNotContains(self.guest_client.get(HOME_URL), POST_TEXT)
+
     def test_unfollowing(self):
         self.assertTrue(
             Follow.objects.filter(
@@ -173,6 +182,9 @@ class PaginatorViewsTest(TestCase):
                 text='Тестовая запись',
                 author=cls.user)
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_quantity_records_posts(self):
         response = self.client.get(HOME_URL)
         self.assertEqual(
@@ -181,8 +193,29 @@ class PaginatorViewsTest(TestCase):
         )
 
     def test_second_page_contains_quantity_records(self):
-        response = self.client.get(HOME_URL + '?page=2')
+        first_page = self.client.get(HOME_URL).context['page']
+        response = self.client.get(
+            HOME_URL + '?after=' + first_page.paginator.next_cursor)
         self.assertEqual(
             len(response.context.get('page')),
             self.post_count
         )
+
+    def test_pages_are_stable_after_new_posts(self):
+        first_page = self.client.get(HOME_URL).context['page']
+        Post.objects.create(text='Новая запись', author=self.user)
+        second_page = self.client.get(
+            HOME_URL + '?after=' + first_page.paginator.next_cursor
+        ).context['page']
+        self.assertEqual(len(second_page), self.post_count)
+        self.assertTrue(set(first_page).isdisjoint(second_page))
+        previous_page = self.client.get(
+            HOME_URL + '?before=' + second_page.paginator.previous_cursor
+        ).context['page']
+        self.assertEqual(list(previous_page), list(first_page))
+        self.assertTrue(previous_page.has_previous())
+
+    def test_broken_cursor_shows_first_page(self):
+        response = self.client.get(HOME_URL + '?after=broken')
+        self.assertFalse(response.context['page'].has_previous())
+        self.assertEqual(len(response.context['page']), POSTS_NUMBER)
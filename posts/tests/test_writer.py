@@ -0,0 +1,105 @@
+import functools
+import threading
+from concurrent.futures import Future
+from contextvars import copy_context
+from unittest import mock
+
+from django.db import IntegrityError, connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import writer
+from posts.models import Comment, Post, User
+
+
+@override_settings(WRITE_QUEUE=True)
+class WriterTest(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create(username='author')
+        self.post = Post.objects.create(text='Запись', author=self.author)
+
+    def comment(self, text):
+        return Comment.objects.create(
+            post=self.post, author=self.author, text=text).text
+
+    def test_writes_run_on_the_writer_thread(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(writer.submit(self.comment, 'Первый'), 'Первый')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(Comment.objects.get().text, 'Первый')
+
+    def test_concurrent_writes_are_committed(self):
+        threads = [threading.Thread(target=writer.submit,
+                                    args=(self.comment, f'Текст {number}'))
+                   for number in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(Comment.objects.count(), 20)
+        self.assertEqual(Post.objects.get().comments_count, 20)
+
+    def test_failing_write_is_rolled_back_alone(self):
+        def duplicate():
+            self.comment('Откатится')
+            User.objects.create(username='author')
+
+        with self.assertRaises(IntegrityError):
+            writer.submit(duplicate)
+        writer.submit(self.comment, 'Сохранится')
+        self.assertEqual(
+            list(Comment.objects.values_list('text', flat=True)),
+            ['Сохранится'])
+
+    def test_dangling_reference_fails_alone(self):
+        good = Comment(post=self.post, author=self.author, text='Сохранится')
+        bad = Comment(post_id=self.post.id + 1, author=self.author,
+                      text='Откатится')
+        batch = [(copy_context(), comment.save, Future())
+                 for comment in (good, bad)]
+        writer.commit(batch)
+        self.assertIsNone(batch[0][2].result())
+        self.assertIsInstance(batch[1][2].exception(), IntegrityError)
+        self.assertEqual(
+            list(Comment.objects.values_list('text', flat=True)),
+            ['Сохранится'])
+        self.assertEqual(Post.objects.get().comments_count, 1)
+
+    def test_retried_write_inserts_a_new_row(self):
+        mine = Comment(post=self.post, author=self.author, text='Мой')
+        bad = Comment(post_id=self.post.id + 1, author=self.author,
+                      text='Откатится')
+        batch = [(copy_context(), functools.partial(writer.insert, comment),
+                  Future()) for comment in (mine, bad)]
+        attempt = writer.attempt
+        calls = []
+
+        def interleaved(context, write):
+            calls.append(write)
+            if len(calls) == len(batch) + 1:
+                # Another process commits between the batch and the retry
+                # and takes the id the rolled-back attempt had used.
+                self.comment('Чужой')
+            return attempt(context, write)
+
+        with mock.patch.object(writer, 'attempt', interleaved):
+            writer.commit(batch)
+        self.assertEqual(
+            sorted(Comment.objects.values_list('text', flat=True)),
+            ['Мой', 'Чужой'])
+        self.assertEqual(Post.objects.get().comments_count, 2)
+
+    def test_views_write_through_the_queue(self):
+        reader = User.objects.create(username='reader')
+        self.client.force_login(reader)
+        self.client.post(
+            reverse('posts:add_comment', args=('author', self.post.id)),
+            {'text': 'Комментарий'})
+        self.client.get(reverse('posts:profile_follow', args=('author',)))
+        self.assertTrue(reader.follower.filter(author=self.author).exists())
+        self.assertEqual(Comment.objects.get().author, reader)
+        response = self.client.post(
+            reverse('posts:add_comment', args=('author', self.post.id + 1)),
+            {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@contextmanager
+def committed(using=DEFAULT_DB_ALIAS):
+    """Run the on_commit callbacks registered inside the block at its end,
+    as if the write had been committed: a TestCase never commits."""
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    try:
+        yield
+    finally:
+        while len(connection.run_on_commit) > start:
+            _, callback = connection.run_on_commit.pop(start)
+            callback()
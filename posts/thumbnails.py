@@ -0,0 +1,78 @@
+"""Thumbnails are rendered by a local worker pool, never inside a request.
+
+Uploads queue every geometry from ``THUMBNAIL_GEOMETRIES`` once the post is
+committed. Until a worker has stored the thumbnail, templates fall back to
+the original image, and a post that was never queued (older uploads, a
+restarted process) is queued by the first page that shows it.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from sorl.thumbnail import get_thumbnail
+
+from posts.settings import (THUMBNAIL_GEOMETRIES, THUMBNAIL_QUEUE_TIMEOUT,
+                            THUMBNAIL_WORKERS)
+from .signals import bump_post_feeds
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            THUMBNAIL_WORKERS, thread_name_prefix='thumbnails')
+    return _executor
+
+
+def ready_key(name, alias):
+    return f'thumbnail:{alias}:{name}'
+
+
+def queued_key(name):
+    return f'thumbnail-queued:{name}'
+
+
+def url(name, alias):
+    """URL of a finished thumbnail, ``None`` while it is not rendered."""
+    return cache.get(ready_key(name, alias))
+
+
+def generate(name, post_id=None):
+    try:
+        for alias, (geometry, options) in THUMBNAIL_GEOMETRIES.items():
+            thumbnail = get_thumbnail(name, geometry, **options)
+            cache.set(ready_key(name, alias), thumbnail.url, None)
+        if post_id is not None:
+            # Cached pages still point at the original image.
+            bump_post_feeds(post_id)
+    except Exception:
+        logger.exception('Thumbnails for %s failed', name)
+    finally:
+        cache.delete(queued_key(name))
+
+
+def _work(name, post_id):
+    try:
+        generate(name, post_id)
+    finally:
+        # Worker threads open their own connections; Django only closes
+        # the ones that belong to request threads.
+        connections.close_all()
+
+
+def _submit(name, post_id):
+    if cache.add(queued_key(name), True, THUMBNAIL_QUEUE_TIMEOUT):
+        executor().submit(_work, name, post_id)
+
+
+def queue(post):
+    """Render all thumbnails of ``post.image`` after the transaction."""
+    if not post.image:
+        return
+    name, post_id = post.image.name, post.id
+    transaction.on_commit(lambda: _submit(name, post_id))
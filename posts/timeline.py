@@ -0,0 +1,123 @@
+from django.db import connection
+from django.db.models import F, Q
+
+from posts.settings import (FANOUT_FOLLOWERS_LIMIT, TIMELINE_BACKFILL_LIMIT,
+                            TIMELINE_BATCH_SIZE)
+from .models import AuthorStats, Follow, Post, Timeline
+
+
+def is_celebrity(author_id):
+    """Posts of authors with too many followers are read on demand."""
+    return AuthorStats.objects.filter(
+        pk=author_id, followers_count__gt=FANOUT_FOLLOWERS_LIMIT).exists()
+
+
+def celebrity_ids(user):
+    return list(
+        Follow.objects.filter(
+            user=user,
+            author__stats__followers_count__gt=FANOUT_FOLLOWERS_LIMIT)
+        .values_list('author_id', flat=True)
+    )
+
+
+def fan_out(post):
+    if is_celebrity(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    Timeline.objects.bulk_create(
+        (Timeline(user_id=user_id, post_id=post.id,
+                  author_id=post.author_id, pub_date=post.pub_date)
+         for user_id in followers.iterator()),
+        batch_size=TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def backfill(user_id, author_id):
+    if is_celebrity(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date')[:TIMELINE_BACKFILL_LIMIT]
+    Timeline.objects.bulk_create(
+        (Timeline(user_id=user_id, post_id=post_id,
+                  author_id=author_id, pub_date=pub_date)
+         for post_id, pub_date in posts),
+        batch_size=TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def rebuild(author_id=None):
+    """Fan posts out to every follower in one statement.
+
+    For bulk loads, which bypass the signals that maintain timelines, or
+    for the followers of one author. Like ``backfill``, each follow gets
+    the author's latest ``TIMELINE_BACKFILL_LIMIT`` posts, and celebrity
+    authors are skipped as in ``fan_out``; counters must be up to date.
+    """
+    ops = connection.ops
+    only = ' WHERE author_id = %s' if author_id is not None else ''
+    sql = (
+        f'{ops.insert_statement(ignore_conflicts=True)} '
+        f'{Timeline._meta.db_table} (user_id, post_id, author_id, pub_date) '
+        'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+        f'FROM {Follow._meta.db_table} AS follow '
+        'JOIN ('
+        ' SELECT id, author_id, pub_date, ROW_NUMBER() OVER ('
+        '  PARTITION BY author_id ORDER BY pub_date DESC, id DESC'
+        ' ) AS position'
+        f' FROM {Post._meta.db_table}{only}'
+        ') AS post ON post.author_id = follow.author_id '
+        f'JOIN {AuthorStats._meta.db_table} AS stats '
+        'ON stats.author_id = follow.author_id '
+        'WHERE post.position <= %s AND stats.followers_count <= %s '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+    )
+    params = [author_id] if author_id is not None else []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql, params + [TIMELINE_BACKFILL_LIMIT, FANOUT_FOLLOWERS_LIMIT])
+
+
+def follower_lost(author_id):
+    """Fan an author who is no longer a celebrity out again.
+
+    Posts written while the author was read on demand, and the posts
+    owed to users who followed meanwhile, are in no timeline, so all the
+    author's followers are refilled once the count drops to the limit.
+    """
+    if AuthorStats.objects.filter(
+            pk=author_id, followers_count=FANOUT_FOLLOWERS_LIMIT).exists():
+        rebuild(author_id)
+
+
+def prune(user_id, author_id):
+    Timeline.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def feed(user):
+    """Posts of followed authors, newest first.
+
+    Fanned-out posts are one range of the user's timeline; posts of
+    celebrity authors are merged in at read time. ``feed_date`` and
+    ``feed_id`` are the pagination keys: on the fan-out path they come
+    from the timeline row, so the page is read straight off its index.
+    """
+    celebrities = celebrity_ids(user)
+    if not celebrities:
+        return Post.objects.filter(timeline__user=user).annotate(
+            feed_date=F('timeline__pub_date'),
+            feed_id=F('timeline__post_id'),
+        ).order_by('-feed_date', '-feed_id')
+    return Post.objects.filter(
+        Q(id__in=Timeline.objects.filter(user=user).values('post_id'))
+        | Q(author_id__in=celebrities)
+    ).annotate(
+        feed_date=F('pub_date'),
+        feed_id=F('id'),
+    ).order_by('-feed_date', '-feed_id')
+
+
+FEED_KEYS = ('feed_date', 'feed_id')
@@ -0,0 +1,236 @@
+"""Streaming JSONL export and import of groups, posts, comments and follows.
+
+Every line holds one record, ``{"model": "post", ...}``. Users and groups
+are referred to by username and slug, so a dump loads into a database
+whose ids differ from the source. Both directions work in fixed-size
+batches and never keep more than one batch in memory.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Follow, Group, Post, User
+
+# Stays below SQLite's limit of 999 bound parameters.
+LOOKUP_CHUNK = 500
+
+EXPORTS = {
+    'group': (Group, (
+        ('slug', 'slug'),
+        ('title', 'title'),
+        ('description', 'description'),
+    )),
+    'post': (Post, (
+        ('id', 'id'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+        ('author', 'author__username'),
+        ('group', 'group__slug'),
+        ('image', 'image'),
+        ('image_compact', 'image_compact'),
+        ('image_width', 'image_width'),
+        ('image_height', 'image_height'),
+    )),
+    'comment': (Comment, (
+        ('id', 'id'),
+        ('post', 'post_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('created', 'created'),
+    )),
+    'follow': (Follow, (
+        ('user', 'user__username'),
+        ('author', 'author__username'),
+    )),
+}
+
+
+class Progress:
+    """Reports how many rows were handled and how fast."""
+
+    def __init__(self, label, write, every=10000):
+        self.label = label
+        self.write = write
+        self.every = every
+        self.count = 0
+        self.reported = None
+        self.started = time.monotonic()
+
+    def tick(self, count=1):
+        before = self.count
+        self.count += count
+        if self.count // self.every != before // self.every:
+            self.report()
+
+    def report(self):
+        if self.reported == self.count:
+            return
+        self.reported = self.count
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        self.write(f'{self.label}: {self.count} записей, '
+                   f'{self.count / elapsed:.0f} записей/с')
+
+
+def export(stream, write, chunk_size=2000):
+    for label, (model, fields) in EXPORTS.items():
+        names, paths = zip(*fields)
+        rows = model.objects.order_by('pk').values_list(*paths)
+        progress = Progress(label, write)
+        for row in rows.iterator(chunk_size=chunk_size):
+            record = {'model': label, **dict(zip(names, row))}
+            stream.write(json.dumps(
+                record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+            progress.tick()
+        progress.report()
+
+
+@contextmanager
+def original_dates():
+    """Store dates from the dump instead of the time of the import.
+
+    bulk_create still runs ``pre_save``, so ``auto_now_add`` has to be
+    switched off for the duration of the load.
+    """
+    fields = [Post._meta.get_field('pub_date'),
+              Comment._meta.get_field('created')]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def lookup(model, field, values):
+    """Map ``values`` of a unique ``field`` to primary keys."""
+    values = list(values)
+    found = {}
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        found.update(model.objects.filter(
+            **{f'{field}__in': values[start:start + LOOKUP_CHUNK]}
+        ).values_list(field, 'pk'))
+    return found
+
+
+class Importer:
+    """Loads a dump batch by batch, one transaction per batch.
+
+    Posts get ids shifted past the largest existing one, so comments
+    find their post by the same offset without keeping a mapping of
+    every imported id. With ``keep_ids`` ids are stored unchanged, which
+    is meant for restoring into an empty database.
+    """
+
+    def __init__(self, batch_size=500, keep_ids=False):
+        self.batch_size = batch_size
+        self.keep_ids = keep_ids
+        self.post_offset = 0
+        if not keep_ids:
+            self.post_offset = Post.objects.aggregate(
+                Max('id'))['id__max'] or 0
+
+    def user_ids(self, usernames):
+        """Ids of ``usernames``, creating unknown users without a password."""
+        usernames = set(usernames)
+        found = lookup(User, 'username', usernames)
+        missing = usernames - found.keys()
+        if missing:
+            User.objects.bulk_create(
+                (User(username=username, password=make_password(None))
+                 for username in missing),
+                ignore_conflicts=True
+            )
+            found.update(lookup(User, 'username', missing))
+        return found
+
+    def load_group(self, records):
+        existing = lookup(Group, 'slug', (r['slug'] for r in records))
+        Group.objects.bulk_create(
+            (Group(slug=r['slug'], title=r['title'],
+                   description=r['description'])
+             for r in records if r['slug'] not in existing),
+            ignore_conflicts=True
+        )
+
+    def load_post(self, records):
+        users = self.user_ids(r['author'] for r in records)
+        groups = lookup(
+            Group, 'slug', {r['group'] for r in records if r['group']})
+        Post.objects.bulk_create(
+            Post(id=self.post_offset + r['id'],
+                 text=r['text'],
+                 pub_date=parse_datetime(r['pub_date']),
+                 author_id=users[r['author']],
+                 group_id=groups.get(r['group']),
+                 image=r['image'] or None,
+                 image_compact=r.get('image_compact') or None,
+                 image_width=r.get('image_width'),
+                 image_height=r.get('image_height'))
+            for r in records
+        )
+
+    def load_comment(self, records):
+        post_ids = {self.post_offset + r['post'] for r in records}
+        missing = post_ids - set(Post.objects.filter(
+            id__in=post_ids).values_list('id', flat=True))
+        if missing:
+            raise ValueError(
+                f'Комментарии к отсутствующим записям: {sorted(missing)}')
+        users = self.user_ids(r['author'] for r in records)
+        Comment.objects.bulk_create(
+            Comment(id=r['id'] if self.keep_ids else None,
+                    post_id=self.post_offset + r['post'],
+                    author_id=users[r['author']],
+                    text=r['text'],
+                    created=parse_datetime(r['created']))
+            for r in records
+        )
+
+    def load_follow(self, records):
+        users = self.user_ids(
+            name for r in records for name in (r['user'], r['author']))
+        Follow.objects.bulk_create(
+            (Follow(user_id=users[r['user']], author_id=users[r['author']])
+             for r in records if r['user'] != r['author']),
+            ignore_conflicts=True
+        )
+
+    def flush(self, label, records):
+        if not records:
+            return
+        loader = getattr(self, f'load_{label}', None)
+        if loader is None:
+            raise ValueError(f'Неизвестный тип записи: {label}')
+        with transaction.atomic():
+            loader(records)
+
+    def load(self, stream, write):
+        label, records, progress = None, [], None
+        with original_dates():
+            for line in stream:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if (record['model'] != label
+                        or len(records) >= self.batch_size):
+                    self.flush(label, records)
+                    if progress is not None:
+                        progress.tick(len(records))
+                    if record['model'] != label:
+                        if progress is not None:
+                            progress.report()
+                        label = record['model']
+                        progress = Progress(label, write)
+                    records = []
+                records.append(record)
+            self.flush(label, records)
+        if progress is not None:
+            progress.tick(len(records))
+            progress.report()
@@ -0,0 +1,134 @@
+"""Hot posts: comments counted with weights that halve every half-life.
+
+A comment written at moment ``t`` adds ``2 ** (t / TRENDING_HALF_LIFE)`` to
+its post's score. Decaying every score by the same factor never changes
+their order, so the posts with the highest score are the posts with the
+most recent comments weighted by age at any moment, without rewriting the
+table as time passes. ``PostScore.hotness`` holds the base-2 logarithm of
+the score, which grows by one per half-life instead of overflowing.
+
+A saved or deleted comment updates one row. ``expire`` (the
+``decay_trending`` command) deletes the rows whose decayed score has
+fallen below ``TRENDING_MIN_SCORE``, so the table only holds posts that
+are still being discussed.
+"""
+import math
+
+from django.db import transaction
+from django.utils import timezone
+
+from posts.settings import (TRENDING_HALF_LIFE, TRENDING_MIN_SCORE,
+                            TRENDING_POSTS_NUMBER)
+from . import generations
+from .models import Comment, Group, Post, PostScore
+
+# A remainder this small is what is left of the last comment after
+# rounding.
+EMPTY = 1e-9
+
+
+def exponent(moment):
+    """log2 of the weight of a comment written at ``moment``."""
+    return moment.timestamp() / TRENDING_HALF_LIFE
+
+
+def added(hotness, weight):
+    """log2(2 ** hotness + 2 ** weight) without leaving log space."""
+    high, low = max(hotness, weight), min(hotness, weight)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def removed(hotness, weight):
+    """log2(2 ** hotness - 2 ** weight), or None if nothing is left."""
+    remainder = 1 - 2 ** min(weight - hotness, 0)
+    if remainder < EMPTY:
+        return None
+    return hotness + math.log2(remainder)
+
+
+def score(hotness, now=None):
+    """The decayed score, the number of comments written ``now`` that the
+    post's comments are worth."""
+    return 2 ** (hotness - exponent(now or timezone.now()))
+
+
+def comment_added(comment):
+    weight = exponent(comment.created)
+    with transaction.atomic():
+        row = PostScore.objects.select_for_update().filter(
+            post_id=comment.post_id).first()
+        if row is None:
+            PostScore.objects.create(
+                post_id=comment.post_id, hotness=weight,
+                group_id=Post.objects.filter(pk=comment.post_id).values_list(
+                    'group_id', flat=True).first())
+            return
+        row.hotness = added(row.hotness, weight)
+        row.save(update_fields=['hotness'])
+
+
+def comment_removed(comment):
+    with transaction.atomic():
+        row = PostScore.objects.select_for_update().filter(
+            post_id=comment.post_id).first()
+        if row is None:
+            return
+        hotness = removed(row.hotness, exponent(comment.created))
+        if hotness is None:
+            row.delete()
+            return
+        row.hotness = hotness
+        row.save(update_fields=['hotness'])
+
+
+def post_moved(post):
+    PostScore.objects.filter(post_id=post.id).update(group_id=post.group_id)
+
+
+def top(group=None, number=TRENDING_POSTS_NUMBER):
+    """The ``number`` hottest posts, of ``group`` if given, read through
+    the hotness indexes of ``PostScore``."""
+    posts = Post.objects.for_feed().filter(score__isnull=False)
+    if group is not None:
+        posts = posts.filter(score__group=group)
+    return posts.order_by('-score__hotness')[:number]
+
+
+def expire(now=None):
+    """Delete scores decayed below ``TRENDING_MIN_SCORE``; returns how
+    many were deleted."""
+    threshold = exponent(now or timezone.now()) + math.log2(
+        TRENDING_MIN_SCORE)
+    stale = PostScore.objects.filter(hotness__lt=threshold)
+    group_ids = set(stale.values_list('group_id', flat=True))
+    deleted, _ = stale.delete()
+    if deleted:
+        generations.bump(generations.INDEX, *[
+            generations.group_scope(group_id)
+            for group_id in group_ids if group_id is not None])
+    return deleted
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every score from the comments; returns how many posts
+    have one."""
+    hotness = {}
+    groups = {}
+    comments = Comment.objects.order_by().values_list(
+        'post_id', 'post__group_id', 'created')
+    for post_id, group_id, created in comments.iterator():
+        weight = exponent(created)
+        if post_id in hotness:
+            hotness[post_id] = added(hotness[post_id], weight)
+        else:
+            hotness[post_id] = weight
+            groups[post_id] = group_id
+    PostScore.objects.all().delete()
+    PostScore.objects.bulk_create(
+        [PostScore(post_id=post_id, group_id=groups[post_id], hotness=value)
+         for post_id, value in hotness.items()])
+    generations.bump(generations.INDEX, *[
+        generations.group_scope(group_id)
+        for group_id in Group.objects.values_list('id', flat=True)])
+    return len(hotness)
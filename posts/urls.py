@@ -11,12 +11,24 @@ urlpatterns = [
     path('new/',
          views.new_post,
          name='new_post'),
+    path('groups/',
+         views.groups,
+         name='groups'),
     path('group/<slug:slug>/',
          views.group_posts,
          name='group_posts'),
+    path('group/<slug:slug>/trending/',
+         views.group_trending_posts,
+         name='group_trending'),
+    path('trending/',
+         views.trending_posts,
+         name='trending'),
     path('follow/',
          views.follow_index,
          name='follow_index'),
+    path('search/',
+         views.search_posts,
+         name='search'),
     path('<str:username>/',
          views.profile,
          name='profile'),
@@ -26,6 +38,9 @@ urlpatterns = [
     path('<str:username>/<int:post_id>/edit/',
          views.post_edit,
          name='post_edit'),
+    path('<str:username>/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('<username>/<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
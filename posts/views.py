@@ -1,38 +1,82 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
-from posts.settings import POSTS_NUMBER, PROFILE_POSTS_NUMBER
-from .models import Post, Group, User, Follow
+from posts.settings import (COMMENTS_NUMBER, GROUPS_NUMBER, POSTS_NUMBER,
+                            PROFILE_POSTS_NUMBER)
+from yatube import db
+from .models import Post, Group, GroupStats, User
 from .forms import CommentForm, PostForm
+from .paginator import CursorPaginator, encode_cursor, paginate
+from . import (follow_graph, page_cache, recommendations, search,
+               thumbnails, timeline, trending, writer)
 
 
+@page_cache.cache_anonymous_page(page_cache.index_scopes)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+    page = paginate(request, post_list, POSTS_NUMBER)
     return render(
         request,
         'index.html',
-        {'page': page, }
+        {
+            'page': page,
+        }
     )
 
 
+@page_cache.cache_anonymous_page(page_cache.group_scopes)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = group.posts.for_feed()
+    page = paginate(request, post_list, POSTS_NUMBER)
     return render(request, 'group.html', {
         'group': group,
         'page': page,
     })
 
 
+@page_cache.cache_anonymous_page(page_cache.index_scopes)
+def groups(request):
+    stats = GroupStats.objects.select_related('group').order_by(
+        '-last_activity', '-group')
+    page = paginate(
+        request, stats, GROUPS_NUMBER, ('last_activity', 'group_id'))
+    return render(request, 'groups.html', {'page': page})
+
+
+@page_cache.cache_anonymous_page(page_cache.index_scopes)
+def trending_posts(request):
+    return render(request, 'trending.html', {
+        'posts': trending.top(),
+    })
+
+
+@page_cache.cache_anonymous_page(page_cache.group_scopes)
+def group_trending_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return render(request, 'trending.html', {
+        'group': group,
+        'posts': trending.top(group),
+    })
+
+
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(search.ranked_post_ids(query), POSTS_NUMBER)
+    page = paginator.get_page(request.GET.get('page'))
+    posts = Post.objects.for_feed().in_bulk(page.object_list)
+    page.object_list = [posts[pk] for pk in page.object_list if pk in posts]
+    return render(request, 'search.html', {
+        'page': page,
+        'query': query,
+    })
+
+
 @login_required
+@db.primary
 def new_post(request):
     form = PostForm(
         request.POST or None,
@@ -44,46 +88,107 @@ def new_post(request):
         })
     post = form.save(commit=False)
     post.author = request.user
-    post.save()
+    writer.submit(save_post, post)
     return redirect(reverse('posts:index'))
 
 
+def save_post(post):
+    writer.insert(post)
+    thumbnails.queue(post)
+
+
+@page_cache.cache_anonymous_page(page_cache.profile_scopes)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    posts = author.posts.for_feed()
     following = (
         request.user.is_authenticated
         and request.user != author
-        and Follow.objects.filter(
-            user=request.user, author=author).exists())
-    paginator = Paginator(posts, PROFILE_POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+        and follow_graph.follows(request.user, author))
+    page = paginate(request, posts, PROFILE_POSTS_NUMBER)
+    suggestions = (recommendations.for_user(request.user)
+                   if request.user == author else [])
     return render(request, 'profile.html', {
         'page': page,
         'author': author,
         'following': following,
+        'suggestions': suggestions,
     })
 
 
+@page_cache.cache_anonymous_page(page_cache.post_scopes)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'),
+        author__username=username, id=post_id)
     form = CommentForm()
     following = (
         request.user.is_authenticated
         and request.user != post.author
-        and Follow.objects.filter(
-            user=request.user, author=post.author).exists())
+        and follow_graph.follows(request.user, post.author))
+    comments, next_cursor = first_comments(post)
     return render(request, 'post.html', {
         'post': post,
         'author': post.author,
         'form': form,
         'following': following,
-        'comments': post.comments.all(),
+        'comments': comments,
+        'next_cursor': next_cursor,
     })
 
 
+def first_comments(post):
+    """The newest ``COMMENTS_NUMBER`` comments and the cursor after them.
+
+    The denormalized counter tells whether older comments exist, so the
+    first page costs a single LIMIT query however long the thread is.
+    """
+    comments = post.comments.for_thread().order_by(
+        '-created', '-id')[:COMMENTS_NUMBER]
+    next_cursor = None
+    if (len(comments) == COMMENTS_NUMBER
+            and post.comments_count > COMMENTS_NUMBER):
+        last = comments[COMMENTS_NUMBER - 1]
+        next_cursor = encode_cursor(last.created, last.id)
+    return comments, next_cursor
+
+
+def older_comments(post, after):
+    paginator = CursorPaginator(
+        post.comments.for_thread(), COMMENTS_NUMBER, ('created', 'id'))
+    return paginator.get_page(after), paginator.next_cursor
+
+
+@page_cache.cache_anonymous_page(page_cache.post_scopes)
+def post_comments(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author').only('author__username'),
+        author__username=username, id=post_id)
+    comments, next_cursor = older_comments(post, request.GET.get('after'))
+    if request.GET.get('format') != 'json':
+        return render(request, 'comment_list.html', {
+            'post': post,
+            'comments': comments,
+            'next_cursor': next_cursor,
+        })
+    more = None
+    if next_cursor is not None:
+        more = (reverse('posts:post_comments', args=(username, post_id))
+                + f'?after={next_cursor}&format=json')
+    return JsonResponse({
+        'comments': [{
+            'id': comment.id,
+            'author': comment.author.username,
+            'text': comment.text,
+            'created': comment.created,
+        } for comment in comments],
+        'next': more,
+    }, json_dumps_params={'ensure_ascii': False})
+
+
 @login_required
+@db.primary
 def post_edit(request, username, post_id):
     if username != request.user.username:
         return redirect('posts:post', username=username, post_id=post_id)
@@ -100,42 +205,48 @@ def post_edit(request, username, post_id):
     if not form.is_valid():
         return render(request, 'new.html', context=context)
     form.save()
+    if 'image' in form.changed_data:
+        thumbnails.queue(post)
     return redirect('posts:post', username=username, post_id=post_id)
 
 
 @login_required
+@db.primary
 def add_comment(request, username, post_id):
+    post = get_object_or_404(Post, id=post_id, author__username=username)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
-        comment.post_id = post_id
+        comment.post = post
         comment.author = request.user
-        comment.save()
+        writer.submit(writer.insert, comment)
     return redirect('posts:post', username, post_id)
 
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, "follow.html", {'page': page})
+    post_list = timeline.feed(request.user).for_feed()
+    page = paginate(request, post_list, POSTS_NUMBER, timeline.FEED_KEYS)
+    return render(request, "follow.html", {
+        'page': page,
+        'suggestions': recommendations.for_user(request.user),
+    })
 
 
 @login_required
+@db.primary
 def profile_follow(request, username):
-    user = get_object_or_404(User, username=username)
-    if (request.user != user and not Follow.objects.filter(
-            user=request.user, author=user).exists()):
-        Follow.objects.create(user=request.user, author=user)
+    author = get_object_or_404(User, username=username)
+    if request.user != author:
+        writer.submit(follow_graph.follow, request.user, author)
     return redirect(request.META.get('HTTP_REFERER', request.path_info))
 
 
 @login_required
+@db.primary
 def profile_unfollow(request, username):
-    get_object_or_404(
-        Follow, user=request.user, author__username=username).delete()
+    writer.submit(follow_graph.unfollow, request.user,
+                  get_object_or_404(User, username=username))
     return redirect(request.META.get('HTTP_REFERER', request.path_info))
 
 
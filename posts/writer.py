@@ -0,0 +1,120 @@
+"""Writes of concurrent requests funnelled through one thread per process.
+
+With ``WRITE_QUEUE`` on, ``submit`` hands a write to the writer thread and
+waits until it is committed. The thread takes the writes queued during a
+``WRITE_TICK``, at most ``WRITE_BATCH_SIZE`` of them, and runs them in one
+transaction, each in its own savepoint so that a failing write is rolled
+back alone and its error raised in the request that submitted it. SQLite
+checks foreign keys only when the transaction commits, so a write that
+references a deleted row fails the whole batch there; the batch is then
+retried one write per transaction and only that write fails. A write may
+therefore run twice and must not rely on what a rolled-back attempt left
+in memory; ``insert`` saves a new row that way. Threads
+of a process then never contend for SQLite's write lock with each other,
+and a burst of comments costs one commit instead of one each. With the
+setting off, ``submit`` runs the write in a transaction of its own in the
+calling thread.
+
+Writes run in the context of the submitting request, so the database
+router sees them as that request's writes.
+"""
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from posts.settings import WRITE_BATCH_SIZE, WRITE_TICK
+
+_queue = None
+_thread = None
+_lock = threading.Lock()
+
+
+def writes():
+    global _queue, _thread
+    with _lock:
+        if _queue is None:
+            _queue = queue.SimpleQueue()
+            _thread = threading.Thread(
+                target=run, args=(_queue,), name='writer', daemon=True)
+            _thread.start()
+    return _queue
+
+
+def submit(write, *args, **kwargs):
+    """Run ``write(*args, **kwargs)`` in a transaction and return its
+    result once committed.
+
+    Must not be called inside ``transaction.atomic``: the writer would wait
+    for the write lock held by the caller, which waits for the writer.
+    """
+    write = functools.partial(write, *args, **kwargs)
+    if not settings.WRITE_QUEUE or threading.current_thread() is _thread:
+        with transaction.atomic():
+            return write()
+    future = Future()
+    writes().put((copy_context(), write, future))
+    return future.result()
+
+
+def insert(instance):
+    """Save ``instance`` as a new row.
+
+    A rolled-back attempt leaves its primary key on the instance, and
+    saving it again would UPDATE whatever row took that key since.
+    """
+    instance.pk = None
+    instance._state.adding = True
+    instance.save(force_insert=True)
+    return instance
+
+
+def collect(jobs):
+    """The first queued write and those queued within ``WRITE_TICK``."""
+    batch = [jobs.get()]
+    deadline = time.monotonic() + WRITE_TICK
+    while len(batch) < WRITE_BATCH_SIZE:
+        try:
+            batch.append(jobs.get(
+                timeout=max(deadline - time.monotonic(), 0)))
+        except queue.Empty:
+            break
+    return batch
+
+
+def attempt(context, write):
+    """Run ``write`` in a transaction or savepoint of its own; returns its
+    result and error."""
+    try:
+        with transaction.atomic():
+            return context.run(write), None
+    except Exception as error:
+        return None, error
+
+
+def commit(batch):
+    try:
+        with transaction.atomic():
+            outcomes = [attempt(context, write) for context, write, _ in batch]
+    except Exception:
+        outcomes = [attempt(context, write) for context, write, _ in batch]
+    for (_, _, future), (result, error) in zip(batch, outcomes):
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+
+def run(jobs):
+    while True:
+        batch = collect(jobs)
+        try:
+            commit(batch)
+        finally:
+            for connection in connections.all():
+                connection.close_if_unusable_or_obsolete()
@@ -0,0 +1,15 @@
+"""SQLite backend whose transactions take the write lock when they begin.
+
+Django opens transactions with a deferred BEGIN, which takes the write
+lock only at the first write. When another connection has written in the
+meantime SQLite cannot wait for it without risking a deadlock and fails
+at once with "database is locked", ignoring busy_timeout. BEGIN IMMEDIATE
+waits for the lock up front, so concurrent comments and follows queue up
+instead of failing. Reads outside ``transaction.atomic`` are unaffected.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
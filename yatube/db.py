@@ -0,0 +1,172 @@
+"""Reads from a replica database, writes and recent writers on the primary.
+
+When ``DATABASES`` has a ``replica`` alias, ``ReplicaRouter`` sends the
+reads of the posts app (feeds, posts, comments, follows) made by requests
+to it and every write to ``default``. The replica lags behind the
+primary, so a request that writes reads from the primary for the rest of
+the request, and ``PrimaryStickinessMiddleware`` then keeps the user on
+the primary for ``REPLICA_STICKY_SECONDS`` with a cookie: they see their
+own post, comment or follow at once while everyone else reads from the
+replica. Unsafe requests and views decorated with ``primary`` never read
+from the replica, and neither do pages rendered for a shared cache, which
+would otherwise keep the replica's lag for as long as they are cached.
+
+Locally the replica is a copy of the SQLite file refreshed by
+``sync_replica`` (the management command of the same name).
+
+Every SQLite connection is set up with ``SQLITE_PRAGMAS`` when opened, and
+``maintain`` (the ``db_maintain`` command) keeps a long-running database
+file small and its query plans current.
+"""
+import functools
+import sqlite3
+import time
+from contextlib import closing
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+REPLICA_APPS = {'posts'}
+INCREMENTAL = 2
+COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+current = ContextVar('database_state', default=None)
+
+
+class State:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replica = REPLICA if REPLICA in settings.DATABASES else None
+
+    def db_for_read(self, model, **hints):
+        if self.replica is None or model._meta.app_label not in REPLICA_APPS:
+            return None
+        state = current.get()
+        # Management commands, migrations and worker threads run outside
+        # requests and read what they are about to write.
+        if state is None or state.pinned or state.wrote:
+            return DEFAULT_DB_ALIAS
+        return self.replica
+
+    def db_for_write(self, model, **hints):
+        state = current.get()
+        if state is not None and model._meta.app_label in REPLICA_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == REPLICA:
+            return False
+        return None
+
+
+def pin():
+    """Send the rest of the current request's reads to the primary."""
+    state = current.get()
+    if state is not None:
+        state.pinned = True
+
+
+def primary(view):
+    """Serve every read of ``view`` from the primary database."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        pin()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class PrimaryStickinessMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def sticky(self, request):
+        try:
+            return float(request.COOKIES.get(COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def __call__(self, request):
+        state = State(
+            request.method not in SAFE_METHODS or self.sticky(request))
+        token = current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        if state.wrote:
+            seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                COOKIE, str(int(time.time() + seconds)), max_age=seconds,
+                httponly=True, samesite='Lax')
+        return response
+
+
+def sync_replica(path=None, source=DEFAULT_DB_ALIAS):
+    """Copy the ``source`` SQLite database over the file at ``path``, the
+    replica's by default.
+
+    Uses SQLite's online backup, which copies a consistent snapshot of the
+    primary; replica readers wait for the copy to finish instead of seeing
+    a half-written file.
+    """
+    connection = connections[source]
+    connection.ensure_connection()
+    path = path or settings.DATABASES[REPLICA]['NAME']
+    with closing(sqlite3.connect(path)) as copy:
+        connection.connection.backup(copy)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """``connection_created`` receiver applying ``SQLITE_PRAGMAS``."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+
+
+def pragma(cursor, statement):
+    cursor.execute(f'PRAGMA {statement}')
+    return cursor.fetchall()
+
+
+def maintain(alias=DEFAULT_DB_ALIAS, pages=None):
+    """Refresh planner statistics, return free pages to the file system
+    and fold the write-ahead log back into the database.
+
+    A database created without incremental auto-vacuum is rebuilt once
+    with VACUUM to switch it on. Returns a report of what was done.
+    """
+    report = {}
+    with connections[alias].cursor() as cursor:
+        (mode,), = pragma(cursor, 'auto_vacuum')
+        if mode != INCREMENTAL:
+            pragma(cursor, f'auto_vacuum={INCREMENTAL}')
+            cursor.execute('VACUUM')
+        report['Полная перестройка (VACUUM)'] = mode != INCREMENTAL
+        cursor.execute('ANALYZE')
+        (free,), = pragma(cursor, 'freelist_count')
+        # SQLite frees one page per step of the pragma and Python's sqlite3
+        # steps a statement without result columns only once.
+        for _ in range(min(free, pages or free)):
+            cursor.execute('PRAGMA incremental_vacuum')
+        (left,), = pragma(cursor, 'freelist_count')
+        report['Освобождено страниц'] = free - left
+        (busy, log, checkpointed), = pragma(
+            cursor, 'wal_checkpoint(TRUNCATE)')
+        report['Страниц перенесено из WAL'] = max(checkpointed, 0)
+        report['Контрольная точка не завершена'] = bool(busy)
+    return report
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'about',
     'users',
     'posts',
+    'api',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yatube.timing.ServerTimingMiddleware',
+    'yatube.db.PrimaryStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,7 +54,7 @@ TEMPLATES_DIR_POSTS = os.path.join(BASE_DIR, 'posts', 'templates')
 TEMPLATES_DIR_USERS = os.path.join(BASE_DIR, 'users', 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'yatube.timing.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR, TEMPLATES_DIR_POSTS, TEMPLATES_DIR_USERS],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,10 +77,37 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Keep connections open between requests instead of reopening the
+        # file and rerunning SQLITE_PRAGMAS every time.
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 600)),
     }
 }
+# Applied to every new SQLite connection by yatube.db.configure_connection:
+# write-ahead logging so readers never block the writer, a wait instead of
+# an immediate "database is locked" when another process writes, and
+# larger page and memory-mapped caches.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+# Path of a read replica, a copy of db.sqlite3 kept fresh by the
+# sync_replica command. Feeds and posts are read from it when set.
+REPLICA_DATABASE = os.getenv('REPLICA_DATABASE')
+if REPLICA_DATABASE:
+    DATABASES['replica'] = {
+        'ENGINE': 'yatube.backends.sqlite3',
+        'NAME': REPLICA_DATABASE,
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+    }
+DATABASE_ROUTERS = ['yatube.db.ReplicaRouter']
+# How long a user who has just written keeps reading from the primary.
+REPLICA_STICKY_SECONDS = 15
 
 
 # Password validation
@@ -121,6 +151,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Larger uploads are streamed to a temporary file instead of memory.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
 
 LOGIN_URL = "/auth/login/"
 LOGIN_REDIRECT_URL = "posts:index"
@@ -129,8 +161,36 @@ LOGOUT_REDIRECT_URL = "posts:index"
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+# Share of requests whose SQL, cache and template timings are reported by
+# yatube.timing.ServerTimingMiddleware.
+TIMING_SAMPLE_RATE = float(os.getenv('TIMING_SAMPLE_RATE', 0.01))
+
+# Commit comments, posts and follows of all request threads in batches from
+# a single writer thread per process (posts.writer).
+WRITE_QUEUE = os.getenv('WRITE_QUEUE') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'yatube.timing.SQLiteCache',
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', os.path.join(BASE_DIR, 'cache.sqlite3')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
     }
 }
@@ -0,0 +1,26 @@
+"""Settings of the test runs: ``manage.py test`` and pytest (pytest.ini)."""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, SQLITE_PRAGMAS
+
+# Test databases are created from scratch on every run, so tests must not
+# see pages and generations cached by earlier runs in the shared cache.
+CACHES = {
+    'default': {
+        'BACKEND': 'yatube.timing.LocMemCache',
+    }
+}
+# Tests that check the timings sample every request themselves.
+TIMING_SAMPLE_RATE = 0
+# Test cases write in transactions that a replica would never see.
+DATABASES.pop('replica', None)
+# Thumbnail workers of transactional tests use the database from their own
+# threads. On a file they wait on busy_timeout; the shared-cache in-memory
+# database fails them at once with "database table is locked".
+DATABASES['default']['TEST'] = {
+    'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+}
+# The file is deleted at the end of the run, a write-ahead log next to it
+# would outlive it.
+SQLITE_PRAGMAS = dict(SQLITE_PRAGMAS, journal_mode='DELETE')
@@ -0,0 +1,193 @@
+"""Per-request timings of SQL, cache calls and template rendering.
+
+``ServerTimingMiddleware`` measures a random ``TIMING_SAMPLE_RATE`` share
+of requests and reports where their time went in a ``Server-Timing``
+header, which browser developer tools show next to the request, and in
+one JSON line of the ``yatube.timing`` logger. A request outside the
+sample costs one random number.
+
+SQL is counted by ``execute_wrapper`` on every database connection; cache
+calls and renders by the cache and template backends of this module,
+which wrap the stock ones and add to the timings of the request being
+served when it is sampled.
+Querysets are evaluated lazily, so the template time includes the SQL and
+cache calls made while rendering.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django.db import connections
+from django.template.backends.django import (
+    DjangoTemplates as BaseDjangoTemplates, Template)
+
+from yatube.cache import SQLiteCache as BaseSQLiteCache
+
+logger = logging.getLogger('yatube.timing')
+current = ContextVar('timings', default=None)
+MISSING = object()
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Metric name: [calls, seconds].
+        self.metrics = {}
+        self.running = set()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, name, seconds):
+        metric = self.metrics.setdefault(name, [0, 0.0])
+        metric[0] += 1
+        metric[1] += seconds
+
+    def describe(self, name, calls):
+        if name == 'cache':
+            return (f'{calls} calls / {self.cache_hits} hits / '
+                    f'{self.cache_misses} misses')
+        return f'{calls} calls'
+
+    def header(self, total):
+        return ', '.join([
+            f'{name};dur={seconds * 1000:.1f};'
+            f'desc="{self.describe(name, calls)}"'
+            for name, (calls, seconds) in self.metrics.items()
+        ] + [f'total;dur={total * 1000:.1f}'])
+
+    def record(self, request, response, total):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+        for name, (calls, seconds) in self.metrics.items():
+            record[f'{name}_calls'] = calls
+            record[f'{name}_ms'] = round(seconds * 1000, 1)
+        return record
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to metric ``name``.
+
+    Yields the timings of the current request, or None when it is not
+    sampled or the block is nested in another one of the same metric,
+    which has already been counted.
+    """
+    timings = current.get()
+    if timings is None or name in timings.running:
+        yield None
+        return
+    timings.running.add(name)
+    started = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.running.discard(name)
+        timings.add(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    with timed('db'):
+        return execute(sql, params, many, context)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        timings = Timings()
+        token = current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(record_query))
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        total = time.perf_counter() - timings.started
+        response['Server-Timing'] = timings.header(total)
+        logger.info(json.dumps(timings.record(request, response, total)))
+        return response
+
+
+class TimedCacheMixin:
+    """Counts calls, hits and misses of a cache backend."""
+
+    def get(self, key, default=None, version=None):
+        with timed('cache') as timings:
+            value = super().get(key, MISSING, version)
+            if timings is not None:
+                if value is MISSING:
+                    timings.cache_misses += 1
+                else:
+                    timings.cache_hits += 1
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        with timed('cache') as timings:
+            found = super().get_many(keys, version)
+            if timings is not None:
+                timings.cache_hits += len(found)
+                timings.cache_misses += len(keys) - len(found)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with timed('cache'):
+            return super().set(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        with timed('cache'):
+            return super().set_many(data, timeout, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with timed('cache'):
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with timed('cache'):
+            return super().incr(key, delta, version)
+
+    def delete(self, key, version=None):
+        with timed('cache'):
+            return super().delete(key, version)
+
+
+class SQLiteCache(TimedCacheMixin, BaseSQLiteCache):
+    pass
+
+
+class LocMemCache(TimedCacheMixin, BaseLocMemCache):
+    pass
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    """Django template backend that times every render."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(
+            super().get_template(template_name).template, self)